@@ -0,0 +1,113 @@
+"""Tests for tools/datetime_util.py."""
+
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, available_timezones
+
+import pytest
+
+import datetime_util
+
+# 1900-01-01 .. 2150-01-01 in roughly monthly steps, past the table horizon
+GRID = range(-2208988800, 5681692800, 30 * 86400 + 3607)
+
+
+@pytest.fixture(params=["array", "numpy"])
+def lookup(request, monkeypatch):
+    """Run a test with OffsetTable's NumPy lookups and with array + bisect."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(datetime_util, "np", None)
+    datetime_util.offset_table.cache_clear()  # tables are built per backend
+    yield request.param
+    datetime_util.offset_table.cache_clear()
+
+
+@pytest.mark.parametrize("name", sorted(available_timezones()))
+def test_offset_table_matches_astimezone(name, lookup):
+    zone = ZoneInfo(name)
+    table = datetime_util.OffsetTable(zone)
+    stamps = [*GRID]
+    for t in table.instants[1:]:
+        stamps += [t - 1, t, t + 1]
+
+    expected = [
+        int(
+            datetime.fromtimestamp(t, timezone.utc)
+            .astimezone(zone)
+            .utcoffset()
+            .total_seconds()
+        )
+        for t in stamps
+    ]
+    assert [table.offset(t) for t in stamps] == expected
+    assert table.offsets_for(stamps) == expected
+
+
+def test_offset_table_out_of_range(lookup):
+    table = datetime_util.OffsetTable(ZoneInfo("America/New_York"))
+    assert table.offsets_for([0, 9e11, float("inf")]) == [-18000, None, None]
+    results = datetime_util._convert_epoch_chunk(
+        ["0", "9e11", "inf", "x"], "America/New_York", "iso"
+    )
+    assert results[0] == ("1969-12-31T19:00:00-05:00", None)
+    assert [result for result, _ in results[1:]] == [None, None, None]
+    assert all(error for _, error in results[1:])
+
+
+def brute_count(cal, start, end):
+    """Business days in [start, end), walking one day at a time."""
+    sign = 1 if start <= end else -1
+    lo, hi = min(start, end), max(start, end)
+    days = (lo + timedelta(days=i) for i in range((hi - lo).days))
+    return sign * sum(
+        d.weekday() not in cal.weekend and d not in HOLIDAYS for d in days
+    )
+
+
+def brute_offset(cal, start, n):
+    """The n-th business day after (before, if negative) start."""
+    d, step = start, 1 if n > 0 else -1
+    for _ in range(abs(n)):
+        d += timedelta(days=step)
+        while d.weekday() in cal.weekend or d in HOLIDAYS:
+            d += timedelta(days=step)
+    return d
+
+
+HOLIDAYS = {date(2023, 12, 25), date(2024, 1, 1), date(2024, 2, 29), date(2025, 1, 1)}
+# Weekdays, weekend days and holidays around two year boundaries and a leap day
+DAYS = [date(2023, 12, 20) + timedelta(days=i) for i in range(0, 420, 3)]
+
+
+@pytest.mark.parametrize("weekend", ["sat,sun", "fri-sat", "sun"])
+def test_business_calendar_count(weekend):
+    cal = datetime_util.BusinessCalendar(
+        datetime_util.parse_weekdays(weekend), HOLIDAYS
+    )
+    for start in DAYS[::7]:
+        for end in DAYS:
+            assert cal.count(start, end) == brute_count(cal, start, end), (start, end)
+
+
+@pytest.mark.parametrize("weekend", ["sat,sun", "fri-sat", "sun"])
+def test_business_calendar_offset(weekend):
+    cal = datetime_util.BusinessCalendar(
+        datetime_util.parse_weekdays(weekend), HOLIDAYS
+    )
+    for start in DAYS:
+        for n in (-300, -20, -1, 0, 1, 5, 20, 300):
+            assert cal.offset(start, n) == brute_offset(cal, start, n), (start, n)
+
+
+def test_business_calendar_grows_both_ways():
+    cal = datetime_util.BusinessCalendar()
+    start = date(2024, 6, 3)  # a Monday; the first year built is 2024
+    assert cal.offset(start, 2610) == date(2034, 6, 5)
+    assert cal.offset(start, -2610) == date(2014, 6, 2)
+    assert cal.count(date(2014, 6, 2), date(2034, 6, 5)) == 5220
+
+
+def test_business_calendar_rejects_all_weekend():
+    with pytest.raises(ValueError):
+        datetime_util.BusinessCalendar(range(7))
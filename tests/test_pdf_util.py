@@ -0,0 +1,121 @@
+"""Tests for tools/pdf_util.py."""
+
+import pytest
+
+import pdf_util
+
+fpdf = pytest.importorskip("fpdf")
+
+
+def make_pdf(path, pages, label="page"):
+    """Write a PDF whose page i reads "{label} {i}"."""
+    doc = fpdf.FPDF()
+    doc.set_font("helvetica", size=12)
+    for i in range(pages):
+        doc.add_page()
+        doc.cell(text=f"{label} {i}")
+    doc.output(str(path))
+    return path
+
+
+def crash_after(pages, monkeypatch):
+    """Make extraction raise once the given number of pages were yielded."""
+    stream = pdf_util.stream_page_texts
+
+    def crashing(*args, **kwargs):
+        for n, item in enumerate(stream(*args, **kwargs)):
+            if n == pages:
+                raise KeyboardInterrupt
+            yield item
+
+    monkeypatch.setattr(pdf_util, "stream_page_texts", crashing)
+
+
+def extracted_pages(dest):
+    return dest.read_text().split(pdf_util.PAGE_SEPARATOR)[:-1]
+
+
+def test_extract_to_file_resumes_after_crash(tmp_path, monkeypatch):
+    src = make_pdf(tmp_path / "a.pdf", 30)
+    dest = tmp_path / "out" / "a.txt"
+    with monkeypatch.context() as m:
+        crash_after(25, m)
+        with pytest.raises(KeyboardInterrupt):
+            pdf_util.extract_to_file(src, dest, checkpoint_pages=10)
+    assert not dest.exists()
+
+    result = pdf_util.extract_to_file(src, dest, checkpoint_pages=10)
+    assert result["pages"] == 30
+    assert result["extracted"] == 10  # resumed from the page 20 checkpoint
+    pages = extracted_pages(dest)
+    assert [p.strip() for p in pages] == [f"page {i}" for i in range(30)]
+    assert not dest.with_name("a.txt.progress").exists()
+
+
+def test_extract_to_file_restarts_when_source_changed(tmp_path, monkeypatch):
+    src = make_pdf(tmp_path / "a.pdf", 30)
+    dest = tmp_path / "a.txt"
+    with monkeypatch.context() as m:
+        crash_after(25, m)
+        with pytest.raises(KeyboardInterrupt):
+            pdf_util.extract_to_file(src, dest, checkpoint_pages=10)
+
+    make_pdf(src, 12, label="new")
+    result = pdf_util.extract_to_file(src, dest, checkpoint_pages=10)
+    assert result["pages"] == result["extracted"] == 12
+    pages = extracted_pages(dest)
+    assert [p.strip() for p in pages] == [f"new {i}" for i in range(12)]
+
+
+def test_extract_to_file_ignores_unreadable_progress(tmp_path):
+    src = make_pdf(tmp_path / "a.pdf", 3)
+    dest = tmp_path / "a.txt"
+    dest.with_name("a.txt.partial").write_text("stale")
+    dest.with_name("a.txt.progress").write_text('{"pages": 2, "off')
+    result = pdf_util.extract_to_file(src, dest)
+    assert result["extracted"] == 3
+    assert [p.strip() for p in extracted_pages(dest)] == ["page 0", "page 1", "page 2"]
+
+
+@pytest.mark.parametrize(
+    "spec, expected",
+    [
+        ("3", [2]),
+        ("1-3,8,10", [0, 1, 2, 7, 9]),
+        ("-1", [9]),  # negative pages count from the end
+        ("-3-", [7, 8, 9]),
+        ("2--8", [1, 2]),
+        ("8-", [7, 8, 9]),  # open end
+        ("--9", [0, 1]),  # open start
+        ("4-1", [3, 2, 1, 0]),  # reversed
+        ("1-:3", [0, 3, 6, 9]),  # stepped
+        ("10-1:4", [9, 5, 1]),
+        ("first 2,last 2", [0, 1, 8, 9]),
+        ("last 20", list(range(10))),
+        ("3,1-4,3", [2, 0, 1, 3]),  # spec order, each page once
+        ("5-100", [4, 5, 6, 7, 8, 9]),  # ranges are clipped to the document
+        ("-100-2", [0, 1]),
+        ("100-8", [9, 8, 7]),
+        ("100-95", []),
+        ("12-", []),
+        ("-20-:7", [4]),  # clipping keeps the step's phase
+        ("30-1:7", [8, 1]),
+    ],
+)
+def test_parse_page_range(spec, expected):
+    assert pdf_util.parse_page_range(spec, 10) == expected
+
+
+@pytest.mark.parametrize("spec", ["0", "11", "-11", "0-5", "x", "1:2", "-", "1-3:0"])
+def test_parse_page_range_rejects(spec):
+    with pytest.raises(ValueError):
+        pdf_util.parse_page_range(spec, 10)
+
+
+@pytest.mark.parametrize("step", [1, 2, 3, 7])
+@pytest.mark.parametrize("start, end", [(-9, 4), (-9, 15), (2, 15), (14, -3), (3, -8)])
+def test_clipped_range_matches_filter(start, end, step):
+    direction = step if start <= end else -step
+    unclipped = range(start, end + (1 if direction > 0 else -1), direction)
+    expected = [i for i in unclipped if 0 <= i < 10]
+    assert list(pdf_util._clipped_range(start, end, step, 10)) == expected
@@ -0,0 +1,769 @@
+#!/usr/bin/env python3
+"""Benchmarks for pdf_util and datetime_util.
+
+Generates synthetic PDFs (fpdf2, a dev dependency) and timestamp datasets,
+times each subcommand end to end, plus in-process parse/lookup loops, and
+stores the results as JSON for comparison against a baseline.
+
+Examples:
+    uv run --group dev tools/bench.py run -o bench.json
+    uv run --group dev tools/bench.py run --quick --only datetime
+    uv run --group dev tools/bench.py run -k extract --repeat 10 --baseline bench.json
+    uv run tools/bench.py compare baseline.json bench.json --threshold 15
+    uv run tools/bench.py compare baseline.json bench.json --case 'dt.serve*=30'
+
+Datasets are cached in --data (default: $TMPDIR/tools-bench), named by
+size and seed, so every run and machine benchmarks the same inputs.
+"""
+
+import argparse
+import csv
+import fnmatch
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, TextIO
+
+import datetime_util
+from pypdf import PdfReader
+from pypdf import __version__ as pypdf_version
+
+try:
+    import fpdf
+except ImportError:  # only needed to generate the PDF datasets
+    fpdf = None
+
+TOOLS = Path(__file__).resolve().parent
+PDF_UTIL = TOOLS / "pdf_util.py"
+DATETIME_UTIL = TOOLS / "datetime_util.py"
+DEFAULT_DATA = Path(tempfile.gettempdir()) / "tools-bench"
+SEED = 20240115
+
+WORDS = (
+    "invoice payment contract liability summary total clause revenue balance "
+    "account quarterly report statement deferred expense income asset equity "
+    "margin forecast audit ledger accrual schedule amendment party term"
+).split()
+RARE_WORD = "zephyr"  # about one line in 500, for search
+LINES_PER_PAGE = {"sparse": 5, "dense": 45}
+PDF_SIZES = {
+    "quick": [(10, "sparse"), (50, "dense")],
+    "full": [
+        (10, "sparse"),
+        (10, "dense"),
+        (100, "sparse"),
+        (100, "dense"),
+        (500, "dense"),
+    ],
+}
+RECORDS = {"quick": 20_000, "full": 200_000}
+ZONES = ["UTC", "EST", "JST", "America/New_York", "Europe/Paris", "Asia/Kolkata"]
+
+
+# Datasets
+
+
+def _write_atomic(path: Path, write: Callable[[Path], None]) -> Path:
+    """Create path with write(tmp) unless it exists; interrupted runs leave no file."""
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        write(tmp)
+        os.replace(tmp, path)
+    return path
+
+
+def make_pdf(path: Path, pages: int, density: str) -> Path:
+    """A PDF of random business words, with an outline entry every 10 pages."""
+    if fpdf is None:
+        print(
+            "Error: fpdf2 is required to generate PDFs (uv run --group dev ...)",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    def write(tmp: Path) -> None:
+        rng = random.Random(f"{SEED}-{pages}-{density}")
+        pdf = fpdf.FPDF()
+        pdf.set_font("Helvetica", size=10)
+        for i in range(pages):
+            pdf.add_page()
+            if i % 10 == 0:
+                pdf.start_section(f"Section {i // 10 + 1}")
+            for _ in range(LINES_PER_PAGE[density]):
+                words = rng.choices(WORDS, k=12)
+                if rng.random() < 0.002:
+                    words[rng.randrange(12)] = RARE_WORD
+                pdf.cell(0, 5, " ".join(words), new_x="LMARGIN", new_y="NEXT")
+        pdf.output(str(tmp))
+
+    return _write_atomic(path, write)
+
+
+def _random_datetimes(n: int, salt: str) -> list[datetime]:
+    rng = random.Random(f"{SEED}-{salt}")
+    start = datetime(2000, 1, 1)
+    return [
+        start + timedelta(seconds=rng.randrange(30 * 365 * 86400)) for _ in range(n)
+    ]
+
+
+def make_dates(path: Path, n: int) -> Path:
+    """One date string per line, cycling through every parse_datetime format."""
+    formats = datetime_util.DATETIME_FORMATS
+
+    def write(tmp: Path) -> None:
+        with open(tmp, "w") as f:
+            for i, dt in enumerate(_random_datetimes(n, "dates")):
+                f.write(dt.strftime(formats[i % len(formats)]) + "\n")
+
+    return _write_atomic(path, write)
+
+
+def make_iso_dates(path: Path, n: int) -> Path:
+    def write(tmp: Path) -> None:
+        with open(tmp, "w") as f:
+            for dt in _random_datetimes(n, "iso"):
+                f.write(dt.strftime("%Y-%m-%d") + "\n")
+
+    return _write_atomic(path, write)
+
+
+def make_epochs(path: Path, n: int) -> Path:
+    def write(tmp: Path) -> None:
+        with open(tmp, "w") as f:
+            for dt in _random_datetimes(n, "epochs"):
+                f.write(f"{int(dt.replace(tzinfo=timezone.utc).timestamp())}\n")
+
+    return _write_atomic(path, write)
+
+
+def make_events_csv(path: Path, n: int) -> Path:
+    def write(tmp: Path) -> None:
+        rng = random.Random(f"{SEED}-csv")
+        with open(tmp, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["id", "ts", "amount"])
+            for i, dt in enumerate(_random_datetimes(n, "csv")):
+                writer.writerow([i, dt.isoformat(sep=" "), rng.randrange(100_000)])
+
+    return _write_atomic(path, write)
+
+
+def generate(data: Path, quick: bool, only: str | None = None) -> dict[str, Any]:
+    """Create (or reuse) the datasets for one tool, or for both.
+
+    Returns the paths by name. Only the PDF datasets need fpdf2.
+    """
+    size = "quick" if quick else "full"
+    sets: dict[str, Any] = {}
+    if only in (None, "pdf"):
+        pdfs = {
+            f"{pages}p-{density}": make_pdf(
+                data / "pdf" / f"{pages}p-{density}.pdf", pages, density
+            )
+            for pages, density in PDF_SIZES[size]
+        }
+        corpus = data / f"corpus-{size}"
+        if not corpus.exists():
+            corpus.mkdir(parents=True)
+            for name, path in pdfs.items():
+                shutil.copyfile(path, corpus / f"{name}.pdf")
+        sets.update(pdfs=pdfs, corpus=corpus)
+    if only in (None, "datetime"):
+        n = RECORDS[size]
+        sets.update(
+            dates=make_dates(data / f"dates-{n}.txt", n),
+            iso_dates=make_iso_dates(data / f"iso-dates-{n}.txt", n),
+            epochs=make_epochs(data / f"epochs-{n}.txt", n),
+            events=make_events_csv(data / f"events-{n}.csv", n),
+            records=n,
+        )
+    return sets
+
+
+# Cases
+
+
+def _pages(path: Path) -> int:
+    return len(PdfReader(path).pages)
+
+
+def pdf_cases(sets: dict, scratch: Path) -> list[dict]:
+    """End-to-end pdf_util runs. Uncached cases pass --no-cache."""
+    cases = []
+    for name, path in sets["pdfs"].items():
+        pages = _pages(path)
+        cases += [
+            {
+                "name": f"pdf.extract.{name}",
+                "argv": [PDF_UTIL, "extract", path, "--no-cache"],
+                "unit": "pages",
+                "units": pages,
+                "profile": True,
+            },
+            {
+                "name": f"pdf.search.{name}",
+                "argv": [PDF_UTIL, "search", path, RARE_WORD, "--no-cache"],
+                "unit": "pages",
+                "units": pages,
+                "ok": (0, 1),
+            },
+        ]
+
+    name, path = list(sets["pdfs"].items())[-1]  # the largest
+    pages = _pages(path)
+    workers = os.cpu_count() or 1
+    corpus = sets["corpus"]
+    corpus_pages = sum(_pages(p) for p in sets["pdfs"].values())
+    cases += [
+        {
+            "name": f"pdf.extract-cached.{name}",
+            "argv": [PDF_UTIL, "extract", path],
+            "unit": "pages",
+            "units": pages,
+        },
+        {
+            "name": f"pdf.extract-workers.{name}",
+            "argv": [PDF_UTIL, "extract", path, "--no-cache", "--workers", workers],
+            "unit": "pages",
+            "units": pages,
+            "workers": workers,
+        },
+        {
+            "name": f"pdf.extract-stream.{name}",
+            "argv": [PDF_UTIL, "extract", path, "--stream"],
+            "unit": "pages",
+            "units": pages,
+        },
+        {
+            "name": f"pdf.extract-dedup.{name}",
+            "argv": [PDF_UTIL, "extract", path, "--no-cache", "--dedup"],
+            "unit": "pages",
+            "units": pages,
+        },
+        {
+            "name": f"pdf.search-cached.{name}",
+            "argv": [PDF_UTIL, "search", path, RARE_WORD, "invoice", "-l"],
+            "unit": "pages",
+            "units": pages,
+            "ok": (0, 1),
+        },
+        {
+            "name": f"pdf.info.{name}",
+            "argv": [PDF_UTIL, "info", path],
+            "unit": "calls",
+            "units": 1,
+        },
+        {
+            "name": f"pdf.toc.{name}",
+            "argv": [PDF_UTIL, "toc", path, "--no-cache"],
+            "unit": "calls",
+            "units": 1,
+        },
+        {
+            "name": "pdf.scan.corpus",
+            "argv": [PDF_UTIL, "scan", corpus, "--workers", workers],
+            "unit": "files",
+            "units": len(sets["pdfs"]),
+            "workers": workers,
+        },
+        {
+            "name": "pdf.bulk-extract.corpus",
+            "argv": [PDF_UTIL, "bulk-extract", corpus, scratch / "bulk"],
+            "setup": lambda: shutil.rmtree(scratch / "bulk", ignore_errors=True),
+            "unit": "pages",
+            "units": corpus_pages,
+        },
+        {
+            "name": "pdf.index-build.corpus",
+            "argv": [PDF_UTIL, "index", "--index", scratch / "index.db"]
+            + ["build", corpus, "--no-cache"],
+            "setup": lambda: (scratch / "index.db").unlink(missing_ok=True),
+            "unit": "pages",
+            "units": corpus_pages,
+        },
+        {
+            "name": "pdf.index-query.corpus",
+            "argv": [PDF_UTIL, "index", "--index", scratch / "index.db"]
+            + ["query", f'"{WORDS[0]} {WORDS[1]}" {RARE_WORD}'],
+            "unit": "calls",
+            "units": 1,
+        },
+    ]
+    return cases
+
+
+def datetime_cases(sets: dict) -> list[dict]:
+    """datetime_util: CLI latency per subcommand, batch throughput, hot loops."""
+    n = sets["records"]
+    tool = [DATETIME_UTIL]
+    single = {
+        "now": ["now", "--tz", "America/New_York", "Asia/Tokyo"],
+        "convert": ["convert", "2024-01-15 09:00", "--from", "EST", "--to", "JST"],
+        "diff": ["diff", "2024-01-15", "2024-03-20", "--business"],
+        "add": ["add", "2024-01-15", "--days", "30", "--business"],
+        "timestamp": ["timestamp", "1705330200", "--tz", "Asia/Tokyo"],
+        "parse": ["parse", "January 15, 2024 2:30 PM"],
+        "recur": ["recur", "2024-01-15 09:00", "--on", "mon-fri", "--limit", "1000"],
+    }
+    cases = [
+        {"name": f"dt.{name}", "argv": tool + argv, "unit": "calls", "units": 1}
+        for name, argv in single.items()
+    ]
+    batch = tool + ["batch"]
+    cases += [
+        {
+            "name": "dt.batch.mixed-formats",
+            "argv": batch + [sets["dates"], "--from", "EST", "--to", "JST"],
+            "unit": "records",
+            "units": n,
+        },
+        {
+            "name": "dt.batch.csv",
+            "argv": batch
+            + [sets["events"], "--format", "csv", "--field", "ts"]
+            + ["--from", "UTC", "--to", "Europe/Paris"],
+            "unit": "records",
+            "units": n,
+        },
+        {
+            "name": "dt.batch.epoch",
+            "argv": batch + [sets["epochs"], "--epoch", "--to", "Asia/Tokyo"],
+            "unit": "records",
+            "units": n,
+        },
+        {
+            "name": "dt.batch.business-add",
+            "argv": batch + [sets["iso_dates"], "--business-add", "10"],
+            "unit": "records",
+            "units": n,
+        },
+        {
+            "name": "dt.aggregate.epoch-hour",
+            "argv": tool
+            + ["aggregate", sets["epochs"], "--epoch"]
+            + ["--tz", "America/New_York", "--bucket", "hour"],
+            "unit": "records",
+            "units": n,
+        },
+    ]
+
+    requests = "".join(
+        json.dumps(
+            {
+                "id": i,
+                "command": "convert",
+                "args": [dt, "--from", "EST", "--to", "JST"],
+            }
+        )
+        + "\n"
+        for i, dt in enumerate(["2024-01-15 09:00", "2024-07-01 18:30"] * 500)
+    )
+    cases.append(
+        {
+            "name": "dt.serve.convert",
+            "argv": tool + ["serve"],
+            "stdin": requests,
+            "unit": "requests",
+            "units": 1000,
+        }
+    )
+
+    # In-process loops over the hot functions
+    with open(sets["dates"]) as f:
+        dates = f.read().splitlines()
+    names = [zone for _ in range(n // len(ZONES)) for zone in ZONES]
+    with open(sets["epochs"]) as f:
+        epochs = [float(line) for line in f]
+    zones = sorted(datetime_util.available_timezones())[::12]
+    calendar = datetime_util.load_calendar()
+    days = [dt.date() for dt in _random_datetimes(n, "days")]
+    pairs = list(zip(days, days[1:]))
+
+    def cold_tables() -> None:
+        datetime_util.offset_table.cache_clear()
+        for zone in zones:
+            datetime_util.offset_table(zone)
+
+    cases += [
+        {
+            "name": "dt.fn.parse_datetime",
+            "fn": lambda: [datetime_util.parse_datetime(s) for s in dates],
+            "unit": "values",
+            "units": len(dates),
+        },
+        {
+            "name": "dt.fn.resolve_tz",
+            "fn": lambda: [datetime_util.resolve_tz(name) for name in names],
+            "unit": "lookups",
+            "units": len(names),
+        },
+        {
+            "name": "dt.fn.tz_index-cold",
+            "fn": lambda: (
+                datetime_util._tz_index.cache_clear(),
+                datetime_util._tz_index(),
+            ),
+            "unit": "calls",
+            "units": 1,
+        },
+        {
+            "name": "dt.fn.offset_table-cold",
+            "fn": cold_tables,
+            "unit": "zones",
+            "units": len(zones),
+        },
+        {
+            "name": "dt.fn.offsets_for",
+            "fn": lambda: datetime_util.offset_table("America/New_York").offsets_for(
+                epochs
+            ),
+            "unit": "timestamps",
+            "units": len(epochs),
+        },
+        {
+            "name": "dt.fn.business_count",
+            "fn": lambda: [calendar.count(a, b) for a, b in pairs],
+            "unit": "ranges",
+            "units": len(pairs),
+        },
+    ]
+    return cases
+
+
+# Measurement
+
+
+def run_case(case: dict, repeat: int, warmup: int, env: dict, scratch: Path) -> dict:
+    """Time a case repeat times after warmup runs; failures are recorded."""
+    times = []
+    for i in range(warmup + repeat):
+        if "setup" in case:
+            case["setup"]()
+        started = time.perf_counter()
+        if "fn" in case:
+            case["fn"]()
+        else:
+            proc = subprocess.run(
+                [sys.executable, *map(str, case["argv"])],
+                input=case.get("stdin", ""),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                env=env,
+            )
+            if proc.returncode not in case.get("ok", (0,)):
+                return {
+                    "error": proc.stderr.strip()[-500:] or f"exit {proc.returncode}"
+                }
+        if i >= warmup:
+            times.append(time.perf_counter() - started)
+
+    median = statistics.median(times)
+    result = {
+        "unit": case["unit"],
+        "units": case["units"],
+        "runs": [round(t, 5) for t in times],
+        "min_s": round(min(times), 5),
+        "median_s": round(median, 5),
+        "mean_s": round(statistics.fmean(times), 5),
+        "stdev_s": round(statistics.stdev(times), 5) if len(times) > 1 else 0.0,
+        "throughput": round(case["units"] / median, 2) if median else None,
+    }
+    if "workers" in case:
+        # Kept out of the name so results from different machines compare
+        result["workers"] = case["workers"]
+    if case.get("profile"):
+        # One more run under --profile for the per-page latency distribution
+        report = scratch / "profile.json"
+        script, *rest = case["argv"]
+        subprocess.run(
+            [
+                sys.executable,
+                str(script),
+                "--profile-out",
+                str(report),
+                *map(str, rest),
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            env=env,
+        )
+        if report.exists():
+            profile = json.loads(report.read_text())
+            result["latency"] = profile["latency"]
+            result["phases"] = profile["phases"]
+    return result
+
+
+def environment(args: argparse.Namespace) -> dict:
+    """What the numbers depend on, to tell apples from oranges in compare."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=TOOLS,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "pypdf": pypdf_version,
+        "fpdf2": getattr(fpdf, "__version__", None),
+        "numpy": getattr(datetime_util.np, "__version__", None),
+        "quick": args.quick,
+        "repeat": args.repeat,
+        "warmup": args.warmup,
+    }
+
+
+def format_rate(result: dict) -> str:
+    if "error" in result:
+        return "ERROR"
+    if result["unit"] == "calls" and result["units"] == 1:
+        return f"{result['median_s'] * 1000:9.1f} ms/call"
+    return f"{result['throughput']:12,.0f} {result['unit']}/s"
+
+
+# Commands
+
+
+def cmd_generate(args: argparse.Namespace) -> None:
+    """Create the datasets without running anything."""
+    sets = generate(args.data, args.quick, args.only)
+    for name, value in sets.items():
+        if isinstance(value, dict):
+            for sub, path in value.items():
+                print(f"{name}.{sub}: {path}")
+        else:
+            print(f"{name}: {value}")
+
+
+def cmd_run(args: argparse.Namespace) -> None:
+    """Run the suite and write results JSON."""
+    if args.repeat is None:
+        args.repeat = 1 if args.quick else 5
+    sets = generate(args.data, args.quick, args.only)
+    scratch = Path(tempfile.mkdtemp(prefix="tools-bench-"))
+    # A private cache, so cached cases don't touch (or depend on) the user's
+    env = dict(os.environ, XDG_CACHE_HOME=str(scratch / "cache"))
+
+    cases = []
+    if args.only in (None, "pdf"):
+        cases += pdf_cases(sets, scratch)
+    if args.only in (None, "datetime"):
+        cases += datetime_cases(sets)
+    if args.k:
+        cases = [c for c in cases if any(k in c["name"] for k in args.k)]
+
+    results = {}
+    try:
+        for case in cases:
+            result = run_case(case, args.repeat, args.warmup, env, scratch)
+            results[case["name"]] = result
+            line = f"{case['name']:42} {format_rate(result)}"
+            if "median_s" in result:
+                line += f"  (median {result['median_s']:.4f}s)"
+            print(line, file=sys.stderr)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    report = {"environment": environment(args), "results": results}
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+
+    failed = [name for name, result in results.items() if "error" in result]
+    for name in failed:
+        print(f"{name}: Error - {results[name]['error']}", file=sys.stderr)
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        if compare(baseline, report, args, out=sys.stderr):
+            sys.exit(1)
+    if failed:
+        sys.exit(1)
+
+
+def parse_case_thresholds(specs: list[str]) -> list[tuple[str, float]]:
+    """Parse 'PATTERN=PCT' overrides (fnmatch patterns on case names)."""
+    overrides = []
+    for spec in specs:
+        pattern, sep, pct = spec.rpartition("=")
+        try:
+            overrides.append((pattern, float(pct)))
+        except ValueError:
+            sep = ""
+        if not sep or not pattern:
+            print(f"Error: Invalid --case '{spec}' (want PATTERN=PCT)", file=sys.stderr)
+            sys.exit(2)
+    return overrides
+
+
+def compare(
+    baseline: dict, current: dict, args: argparse.Namespace, out: TextIO = sys.stdout
+) -> int:
+    """Print a comparison table to out; returns the number of regressions."""
+    overrides = parse_case_thresholds(args.case)
+    base, cur = baseline["results"], current["results"]
+
+    for key in ("python", "pypdf", "machine", "cpus", "numpy", "quick"):
+        before = baseline["environment"].get(key)
+        after = current["environment"].get(key)
+        if before != after:
+            print(f"Note: {key} differs ({before} -> {after})", file=sys.stderr)
+    for name in sorted(base.keys() & cur.keys()):
+        before, after = base[name].get("workers"), cur[name].get("workers")
+        if before != after:
+            print(f"Note: {name} workers differ ({before} -> {after})", file=sys.stderr)
+
+    regressions = 0
+    print(
+        f"{'case':42} {'baseline':>10} {'current':>10} {'change':>8}  status", file=out
+    )
+    for name in sorted(cur):
+        old, new = base.get(name, {}), cur[name]
+        if args.metric not in old or args.metric not in new:
+            if "error" in new:
+                status = "ERROR"
+                regressions += 1
+            else:
+                status = "new" if name not in base else "no baseline"
+            print(f"{name:42} {'':>10} {'':>10} {'':>8}  {status}", file=out)
+            continue
+        limit = next(
+            (pct for pattern, pct in overrides if fnmatch.fnmatchcase(name, pattern)),
+            args.threshold,
+        )
+        change = (
+            (new[args.metric] / old[args.metric] - 1) * 100 if old[args.metric] else 0.0
+        )
+        if change > limit:
+            status = f"REGRESSED (>{limit:g}%)"
+            regressions += 1
+        elif change < -limit:
+            status = "improved"
+        else:
+            status = "ok"
+        print(
+            f"{name:42} {old[args.metric]:10.4f} {new[args.metric]:10.4f} "
+            f"{change:+7.1f}%  {status}",
+            file=out,
+        )
+    skipped = len(base.keys() - cur.keys())
+    if skipped:
+        print(f"\n{skipped} baseline case(s) not in the current run", file=out)
+    if regressions:
+        print(f"\n{regressions} regression(s) over threshold", file=sys.stderr)
+    return regressions
+
+
+def cmd_compare(args: argparse.Namespace) -> None:
+    """Compare two results files; exit 1 on any regression."""
+    try:
+        baseline = json.loads(Path(args.baseline).read_text())
+        current = json.loads(Path(args.current).read_text())
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    if compare(baseline, current, args):
+        sys.exit(1)
+
+
+def add_threshold_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="Allowed slowdown in percent (default: 10)",
+    )
+    parser.add_argument(
+        "--case",
+        action="append",
+        default=[],
+        metavar="PATTERN=PCT",
+        help="Threshold for cases matching a glob, e.g. 'dt.serve*=30' (repeatable)",
+    )
+    parser.add_argument(
+        "--metric",
+        choices=["median_s", "min_s", "mean_s"],
+        default="median_s",
+        help="Statistic to compare (default: median_s)",
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks for pdf_util and datetime_util",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    data_args = argparse.ArgumentParser(add_help=False)
+    data_args.add_argument(
+        "--data",
+        type=Path,
+        default=DEFAULT_DATA,
+        help=f"Dataset directory (default: {DEFAULT_DATA})",
+    )
+    data_args.add_argument(
+        "--quick", action="store_true", help="Small datasets, one run per case"
+    )
+    data_args.add_argument("--only", choices=["pdf", "datetime"], help="One tool only")
+
+    # generate
+    p_gen = subparsers.add_parser(
+        "generate", help="Create the benchmark datasets", parents=[data_args]
+    )
+    p_gen.set_defaults(func=cmd_generate)
+
+    # run
+    p_run = subparsers.add_parser("run", help="Run the benchmarks", parents=[data_args])
+    p_run.add_argument(
+        "-o", "--output", help="Write results JSON here (default: stdout)"
+    )
+    p_run.add_argument(
+        "--repeat", type=int, help="Timed runs per case (default: 5, --quick: 1)"
+    )
+    p_run.add_argument(
+        "--warmup", type=int, default=1, help="Untimed runs per case (default: 1)"
+    )
+    p_run.add_argument(
+        "-k", action="append", help="Only cases whose name contains this (repeatable)"
+    )
+    p_run.add_argument("--baseline", help="Also compare against this results file")
+    add_threshold_args(p_run)
+    p_run.set_defaults(func=cmd_run)
+
+    # compare
+    p_cmp = subparsers.add_parser("compare", help="Compare results against a baseline")
+    p_cmp.add_argument("baseline", help="Baseline results JSON")
+    p_cmp.add_argument("current", help="Current results JSON")
+    add_threshold_args(p_cmp)
+    p_cmp.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
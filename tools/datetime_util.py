@@ -1,21 +1,58 @@
 #!/usr/bin/env python3
 """Datetime utility for timezone conversions and calculations.
 
-Uses only stdlib (zoneinfo, datetime). No external dependencies.
+Uses only stdlib (zoneinfo, datetime). No external dependencies; NumPy is
+used for vectorized timestamp lookups when it happens to be installed.
 
 Examples:
     uv run tools/datetime_util.py now --tz America/New_York Asia/Tokyo
     uv run tools/datetime_util.py convert "2024-01-15 09:00" --from America/New_York --to Asia/Tokyo
     uv run tools/datetime_util.py diff "2024-01-15" "2024-03-20"
     uv run tools/datetime_util.py add "2024-01-15" --days 30
+    uv run tools/datetime_util.py add "2024-01-15" --days 30 --business --holidays holidays.txt
+    uv run tools/datetime_util.py recur "2024-01-15 09:00" --tz America/New_York --on mon-fri --show Asia/Tokyo
     uv run tools/datetime_util.py timestamp 1705330200
     uv run tools/datetime_util.py parse "January 15, 2024 2:30 PM"
+    uv run tools/datetime_util.py batch times.txt --from EST --to JST
+    uv run tools/datetime_util.py batch logs.csv --format csv --field ts --to UTC --workers 4
+    uv run tools/datetime_util.py aggregate events.txt --epoch --tz Asia/Tokyo --bucket hour --top 5
+    uv run tools/datetime_util.py serve --socket /tmp/datetime_util.sock
+    uv run tools/datetime_util.py --profile batch times.txt --from EST --to JST > /dev/null
+
+Serve protocol: one JSON object per line, e.g.
+    {"id": 1, "command": "convert", "args": ["2024-01-15 09:00", "--from", "EST", "--to", "JST"]}
+answered with {"id": 1, "ok": true, "output": "..."} or {"id": 1, "ok": false, "error": "..."}.
 """
 
 import argparse
+import calendar
+import csv
+import io
+import json
+import math
+import re
+import signal
+import struct
 import sys
-from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo, available_timezones
+import time
+from array import array
+from bisect import bisect_right
+from collections import Counter, deque
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager, nullcontext, redirect_stderr, redirect_stdout
+from datetime import MAXYEAR, date, datetime, timedelta, timezone
+from functools import lru_cache, partial
+from itertools import accumulate, count, islice
+from pathlib import Path
+from typing import Any, TextIO
+from zoneinfo import TZPATH, ZoneInfo, ZoneInfoNotFoundError, available_timezones
+
+try:
+    import numpy as np
+except ImportError:  # optional: OffsetTable falls back to array + bisect
+    np = None
+
+from profiler import Profiler, add_profile_args, profile_session
 
 # Common timezone aliases
 TZ_ALIASES: dict[str, str] = {
@@ -43,19 +80,363 @@ TZ_ALIASES: dict[str, str] = {
 }
 
 
+_profile: Profiler | None = None
+
+
+def profiled(name: str):
+    """Time a phase when profiling; a no-op context otherwise."""
+    return _profile.phase(name) if _profile is not None else nullcontext()
+
+
+def _lru_counts() -> dict[str, tuple[int, int]]:
+    """(hits, misses) of the lru_caches on the hot paths, in this process."""
+    caches = {
+        "tz_index": _tz_index,
+        "zone": _zone,
+        "offset_table": offset_table,
+        "parse_shape": _rule_for_shape,
+        "calendar": load_calendar,
+    }
+    return {
+        name: (fn.cache_info().hits, fn.cache_info().misses)
+        for name, fn in caches.items()
+    }
+
+
+def _call_profiled(fn: Callable[[Any], Any], item: Any) -> tuple[Any, dict]:
+    """Run fn(item) in a pool worker under a fresh Profiler.
+
+    Workers are forked with the parent's cache statistics, so only the
+    change during this call is sent back.
+    """
+    global _profile
+    _profile = Profiler()
+    before = _lru_counts()
+    result = fn(item)
+    for name, (hits, misses) in _lru_counts().items():
+        _profile.add_cache(name, hits - before[name][0], misses - before[name][1])
+    return result, _profile.snapshot()
+
+
+@contextmanager
+def profiling(args: argparse.Namespace) -> Iterator[None]:
+    """Run a command under the profiling options given (see profile_session)."""
+    global _profile
+    try:
+        with profile_session(args) as _profile:
+            try:
+                yield
+            finally:
+                if _profile is not None:
+                    for name, (hits, misses) in _lru_counts().items():
+                        _profile.add_cache(name, hits, misses)
+    finally:
+        _profile = None
+
+
+@lru_cache(maxsize=1)
+def _tz_index() -> dict[str, str]:
+    """Map lowercased zone names and aliases to canonical IANA names.
+
+    Built once per process; ``available_timezones()`` walks tzdata on disk.
+    Aliases are applied last so they win over same-named IANA zones (EST).
+    """
+    with profiled("available_timezones"):
+        zones = available_timezones()
+    index = {tz.lower(): tz for tz in zones}
+    index["utc"] = "UTC"
+    for alias, tz in TZ_ALIASES.items():
+        index[alias.lower()] = tz
+    return index
+
+
+@lru_cache(maxsize=256)
+def _zone(name: str) -> ZoneInfo:
+    """Return a cached ZoneInfo for a canonical zone name."""
+    with profiled("zoneinfo_load"):
+        return ZoneInfo(name)
+
+
 def resolve_tz(tz_str: str) -> ZoneInfo:
-    """Resolve timezone string to ZoneInfo, supporting aliases."""
-    tz_upper = tz_str.upper()
-    if tz_upper in TZ_ALIASES:
-        return ZoneInfo(TZ_ALIASES[tz_upper])
-    if tz_str in available_timezones() or tz_str == "UTC":
-        return ZoneInfo(tz_str)
-    # Try case-insensitive match
-    tz_lower = tz_str.lower()
-    for tz in available_timezones():
-        if tz.lower() == tz_lower:
-            return ZoneInfo(tz)
-    raise ValueError(f"Unknown timezone: {tz_str}")
+    """Resolve timezone string to ZoneInfo, supporting aliases.
+
+    Aliases and exact IANA keys resolve without walking tzdata; only a
+    name in the wrong case needs the full index.
+    """
+    alias = TZ_ALIASES.get(tz_str.upper())
+    if alias is not None:
+        return _zone(alias)
+    try:
+        return _zone(tz_str)
+    except (ZoneInfoNotFoundError, ValueError):
+        pass
+    name = _tz_index().get(tz_str.lower())
+    if name is None:
+        raise ValueError(f"Unknown timezone: {tz_str}")
+    return _zone(name)
+
+
+def _read_tzif(key: str) -> tuple[list[int], str]:
+    """Return (transition instants, POSIX TZ footer) from a zone's TZif file.
+
+    Looks in TZPATH, then the tzdata package. Returns ([], "") if no file is
+    found, in which case callers probe ZoneInfo for the whole range.
+    """
+    data = None
+    for root in TZPATH:
+        path = Path(root, key)
+        if path.is_file():
+            data = path.read_bytes()
+            break
+    if data is None:
+        from importlib import resources  # rarely needed; slow to import
+
+        *dirs, name = key.split("/")
+        try:
+            package = resources.files(".".join(["tzdata", "zoneinfo", *dirs]))
+            data = package.joinpath(name).read_bytes()
+        except (ImportError, OSError, ValueError):
+            return [], ""
+    if data[:4] != b"TZif":
+        return [], ""
+
+    def counts(offset: int) -> tuple[int, ...]:
+        return struct.unpack(">6l", data[offset + 20 : offset + 44])
+
+    isutcnt, isstdcnt, leapcnt, timecnt, typecnt, charcnt = counts(0)
+    if data[4:5] == b"\0":
+        return list(struct.unpack(f">{timecnt}l", data[44 : 44 + timecnt * 4])), ""
+
+    # Skip the 32-bit v1 block and read the 64-bit v2+ block and footer
+    offset = 44 + timecnt * 5 + typecnt * 6 + charcnt + leapcnt * 8
+    offset += isstdcnt + isutcnt
+    isutcnt, isstdcnt, leapcnt, timecnt, typecnt, charcnt = counts(offset)
+    offset += 44
+    transitions = list(
+        struct.unpack(f">{timecnt}q", data[offset : offset + timecnt * 8])
+    )
+    offset += timecnt * 9 + typecnt * 6 + charcnt + leapcnt * 12 + isstdcnt + isutcnt
+    footer = data[offset:].strip(b"\n").decode("ascii", "replace")
+    return transitions, footer
+
+
+# A POSIX TZ string with only a standard-time part, e.g. "JST-9" or "<+07>-7"
+_FIXED_TZ_RULE = re.compile(r"(?:[A-Za-z]{3,}|<[^>]+>)[-+]?\d[\d:]*")
+
+
+class OffsetTable:
+    """Precomputed UTC-offset transitions for one zone.
+
+    offsets[i] applies from instants[i] (inclusive) up to instants[i + 1];
+    instants[0] is a sentinel for "since forever". Offsets are taken from
+    ZoneInfo itself, so lookups agree with datetime.astimezone. Past the
+    horizon year lookups defer to ZoneInfo, and timestamps datetime cannot
+    represent have no offset (None).
+    """
+
+    def __init__(self, zone: ZoneInfo, horizon_year: int = 2100) -> None:
+        self.zone = zone
+        self.horizon = int(
+            datetime(horizon_year, 1, 1, tzinfo=timezone.utc).timestamp()
+        )
+
+        transitions, footer = _read_tzif(str(zone))
+        candidates = [t for t in transitions if t < self.horizon]
+        if not (candidates and _FIXED_TZ_RULE.fullmatch(footer)):
+            start = candidates[-1] if candidates else 0
+            candidates.extend(self._probe_transitions(start, self.horizon))
+
+        instants = [-(2**63)]
+        offsets = [self._offset_at(candidates[0] - 1 if candidates else 0)]
+        for t in candidates:
+            offset = self._offset_at(t)
+            if offset != offsets[-1]:
+                instants.append(t)
+                offsets.append(offset)
+
+        self.instants = array("q", instants)
+        self.offsets = array("l", offsets)
+        if np is not None:
+            self._np_instants = np.array(instants, dtype=np.int64)
+            self._np_offsets = np.array(offsets, dtype=np.int64)
+
+    def _offset_at(self, t: int) -> int:
+        return int(datetime.fromtimestamp(t, tz=self.zone).utcoffset().total_seconds())
+
+    def _probe_transitions(self, start: int, end: int) -> Iterator[int]:
+        """Find offset changes in [start, end) by weekly sampling + bisection.
+
+        Covers the range after the last explicit TZif transition, where
+        ZoneInfo applies the file's POSIX TZ rule (at most two changes a
+        year, so a weekly step cannot step over one).
+        """
+        week = 7 * 86400
+        t, offset = start, self._offset_at(start)
+        while t < end:
+            nxt = min(t + week, end)
+            nxt_offset = self._offset_at(nxt)
+            if nxt_offset != offset:
+                lo, hi = t, nxt  # offset(lo) == offset, offset(hi) != offset
+                while hi - lo > 1:
+                    mid = (lo + hi) // 2
+                    if self._offset_at(mid) == offset:
+                        lo = mid
+                    else:
+                        hi = mid
+                yield hi
+                offset = nxt_offset
+            t = nxt
+
+    def offset(self, ts: float) -> int | None:
+        """UTC offset in seconds at one Unix timestamp (None if out of range)."""
+        if ts >= self.horizon:
+            try:
+                return self._offset_at(ts)
+            except (OverflowError, OSError, ValueError):
+                return None
+        return self.offsets[bisect_right(self.instants, ts) - 1]
+
+    def offsets_for(self, timestamps: Iterable[float]) -> list[int | None]:
+        """UTC offsets in seconds for a batch of Unix timestamps."""
+        if np is not None:
+            ts = np.asarray(timestamps, dtype=np.float64)
+            idx = np.searchsorted(self._np_instants, ts, side="right") - 1
+            result = self._np_offsets[idx].tolist()
+            for i in np.nonzero(ts >= self.horizon)[0]:
+                result[i] = self.offset(float(ts[i]))
+            return result
+        return [self.offset(ts) for ts in timestamps]
+
+
+@lru_cache(maxsize=64)
+def offset_table(tz_str: str) -> OffsetTable:
+    """Return the (cached) OffsetTable for a timezone string."""
+    zone = resolve_tz(tz_str)
+    with profiled("offset_table_build"):
+        return OffsetTable(zone)
+
+
+_WEEKDAYS = [name.lower() for name in calendar.day_abbr]  # mon .. sun
+
+
+def parse_weekdays(spec: str) -> frozenset[int]:
+    """Parse weekdays like 'sat,sun' or 'mon-fri' into numbers (Mon=0)."""
+
+    def weekday(name: str) -> int:
+        key = name.strip().lower()[:3]
+        if key not in _WEEKDAYS:
+            raise ValueError(f"Unknown weekday: {name.strip()}")
+        return _WEEKDAYS.index(key)
+
+    days = set()
+    for part in spec.split(","):
+        first, _, last = part.partition("-")
+        start = weekday(first)
+        end = weekday(last) if last else start
+        days.update((start + i) % 7 for i in range((end - start) % 7 + 1))
+    return frozenset(days)
+
+
+def read_holidays(path: str) -> set[date]:
+    """Read holiday dates, one per line; text after a comma or '#' is ignored."""
+    holidays = set()
+    with open(path) as f:
+        for line in f:
+            value = line.split("#", 1)[0].split(",", 1)[0].strip()
+            if value:
+                holidays.add(parse_datetime(value).date())
+    return holidays
+
+
+class BusinessCalendar:
+    """Workday calendar backed by per-year bitmaps and prefix sums.
+
+    Years are built lazily and kept contiguous. Each has a bytearray of
+    workday flags, a prefix-sum array over it and the running number of
+    workdays before its January 1st, so count() is O(1) and offset() is a
+    pair of bisections.
+    """
+
+    def __init__(
+        self, weekend: Iterable[int] = (5, 6), holidays: Iterable[date] = ()
+    ) -> None:
+        self.weekend = frozenset(weekend)
+        if len(self.weekend) >= 7:
+            raise ValueError("Weekend cannot cover the whole week")
+        self._holidays = {d.toordinal() for d in holidays}
+        self._first_year = 0
+        self._bases: list[int] = []  # workdays before Jan 1 of each year
+        self._bitmaps: list[bytearray] = []
+        self._prefix: list[array] = []  # prefix[doy] = workdays before doy
+
+    def _build_year(self, year: int) -> tuple[bytearray, array]:
+        first = date(year, 1, 1).toordinal()
+        days = 366 if calendar.isleap(year) else 365
+        weekday = date(year, 1, 1).weekday()
+        bitmap = bytearray(
+            (weekday + i) % 7 not in self.weekend and first + i not in self._holidays
+            for i in range(days)
+        )
+        return bitmap, array("l", accumulate(bitmap, initial=0))
+
+    def _ensure(self, year: int) -> int:
+        """Materialize years up to and including year; return its index."""
+        if not self._bases:
+            bitmap, prefix = self._build_year(year)
+            self._first_year = year
+            self._bases.append(0)
+            self._bitmaps.append(bitmap)
+            self._prefix.append(prefix)
+        while year < self._first_year:
+            bitmap, prefix = self._build_year(self._first_year - 1)
+            self._first_year -= 1
+            self._bases.insert(0, self._bases[0] - prefix[-1])
+            self._bitmaps.insert(0, bitmap)
+            self._prefix.insert(0, prefix)
+        while year >= self._first_year + len(self._bases):
+            bitmap, prefix = self._build_year(self._first_year + len(self._bases))
+            self._bases.append(self._bases[-1] + self._prefix[-1][-1])
+            self._bitmaps.append(bitmap)
+            self._prefix.append(prefix)
+        return year - self._first_year
+
+    def _rank(self, d: date) -> int:
+        """Number of workdays before d, relative to the first built year."""
+        i = self._ensure(d.year)
+        return self._bases[i] + self._prefix[i][d.timetuple().tm_yday - 1]
+
+    def is_business_day(self, d: date) -> bool:
+        return bool(self._bitmaps[self._ensure(d.year)][d.timetuple().tm_yday - 1])
+
+    def count(self, start: date, end: date) -> int:
+        """Business days in [start, end); negative if end is before start."""
+        return self._rank(end) - self._rank(start)
+
+    def offset(self, start: date, n: int) -> date:
+        """Date n business days after start (before it if n is negative)."""
+        if n == 0:
+            return start
+        rank = self._rank(start)
+        target = rank + self.is_business_day(start) + n - 1 if n > 0 else rank + n
+
+        # Grow the materialized range until it holds the target workday
+        while target < self._bases[0]:
+            self._ensure(self._first_year - 1)
+        while target >= self._bases[-1] + self._prefix[-1][-1]:
+            self._ensure(self._first_year + len(self._bases))
+
+        i = bisect_right(self._bases, target) - 1
+        doy = bisect_right(self._prefix[i], target - self._bases[i]) - 1
+        return date(self._first_year + i, 1, 1) + timedelta(days=doy)
+
+
+@lru_cache(maxsize=8)
+def load_calendar(weekend: str = "sat,sun", holidays: str | None = None):
+    """Return a cached BusinessCalendar for a weekend spec and holiday file."""
+    with profiled("calendar_load"):
+        return BusinessCalendar(
+            parse_weekdays(weekend), read_holidays(holidays) if holidays else ()
+        )
 
 
 def format_dt(dt: datetime, include_offset: bool = True) -> str:
@@ -124,23 +505,40 @@ def cmd_diff(args: argparse.Namespace) -> None:
         print(f"  {weeks} weeks, {remaining_days} days")
     if hours or minutes:
         print(f"  {hours} hours, {minutes} minutes")
+    if args.business:
+        cal = load_calendar(args.weekend, args.holidays)
+        business = abs(cal.count(dt1.date(), dt2.date()))
+        print(f"  {business} business days")
 
 
 def cmd_add(args: argparse.Namespace) -> None:
     """Add duration to a date."""
     dt = parse_datetime(args.date)
 
+    # With --business, --days counts business days and is applied first
+    business_days = (args.days or 0) if args.business else 0
     delta = timedelta(
-        days=args.days or 0,
+        days=0 if args.business else args.days or 0,
         weeks=args.weeks or 0,
         hours=args.hours or 0,
         minutes=args.minutes or 0,
     )
 
-    result = dt + delta
+    result = dt
+    if args.business:
+        cal = load_calendar(args.weekend, args.holidays)
+        result = datetime.combine(
+            cal.offset(dt.date(), business_days), dt.time(), dt.tzinfo
+        )
+    result = result + delta
 
     print(f"Start:  {dt.strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"Add:    {delta}")
+    if args.business:
+        print(
+            f"Add:    {business_days} business days" + (f", {delta}" if delta else "")
+        )
+    else:
+        print(f"Add:    {delta}")
     print(f"Result: {result.strftime('%Y-%m-%d %H:%M:%S')}")
 
 
@@ -180,28 +578,119 @@ def cmd_parse(args: argparse.Namespace) -> None:
         print(f"Timestamp: {int(dt.timestamp())}")
 
 
-def parse_datetime(s: str) -> datetime:
-    """Parse datetime from various formats."""
-    formats = [
-        "%Y-%m-%d %H:%M:%S",
-        "%Y-%m-%d %H:%M",
-        "%Y-%m-%d",
-        "%Y/%m/%d %H:%M:%S",
-        "%Y/%m/%d",
-        "%d/%m/%Y",
-        "%m/%d/%Y",
-        "%B %d, %Y %I:%M %p",
-        "%B %d, %Y %I:%M:%S %p",
-        "%B %d, %Y",
-        "%b %d, %Y",
-        "%Y-%m-%dT%H:%M:%S",
-        "%Y-%m-%dT%H:%M:%SZ",
-    ]
-
-    for fmt in formats:
+# Formats tried in order by the fallback parser; the first match wins
+DATETIME_FORMATS = [
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d",
+    "%Y/%m/%d %H:%M:%S",
+    "%Y/%m/%d",
+    "%d/%m/%Y",
+    "%m/%d/%Y",
+    "%B %d, %Y %I:%M %p",
+    "%B %d, %Y %I:%M:%S %p",
+    "%B %d, %Y",
+    "%b %d, %Y",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M:%SZ",
+]
+
+_MONTHS = {name.lower(): i for i, name in enumerate(calendar.month_name) if name}
+_MONTH_ABBRS = {name.lower(): i for i, name in enumerate(calendar.month_abbr) if name}
+
+
+def _build_ymd(m: re.Match) -> datetime:
+    """Build from groups (Y, m, d[, H, M[, S]]) - the dash and slash shapes."""
+    return datetime(*(int(g) for g in m.groups() if g is not None))
+
+
+def _build_dmy(m: re.Match) -> datetime:
+    """Build from a/b/YYYY, preferring day-first like DATETIME_FORMATS."""
+    a, b, year = (int(g) for g in m.groups())
+    try:
+        return datetime(year, b, a)
+    except ValueError:
+        return datetime(year, a, b)
+
+
+def _build_month_name(m: re.Match) -> datetime:
+    """Build from 'January 15, 2024[ 2:30[:00] PM]' (abbreviations: date only)."""
+    name, day, year, hour, minute, second, ampm = m.groups()
+    name = name.lower()
+    month = _MONTHS.get(name) or (hour is None and _MONTH_ABBRS.get(name))
+    if not month:
+        raise ValueError(f"Unknown month: {name}")
+    if hour is None:
+        return datetime(int(year), month, int(day))
+    hour = int(hour)
+    if not 1 <= hour <= 12:
+        raise ValueError(f"Hour out of range: {hour}")
+    hour = hour % 12 + (12 if ampm.lower() == "pm" else 0)
+    return datetime(int(year), month, int(day), hour, int(minute), int(second or 0))
+
+
+def _build_iso(m: re.Match) -> datetime:
+    """Build via fromisoformat (fractions, offsets, 'Z' as UTC)."""
+    return datetime.fromisoformat(m.string.replace("Z", "+00:00"))
+
+
+# (pattern, builder) pairs. Each pattern accepts a superset of the strptime
+# formats it stands in for, so a miss here is never a miss in the fallback.
+# Order mirrors DATETIME_FORMATS; the fromisoformat rule must stay last.
+_PARSE_RULES: list[tuple[re.Pattern, Callable[[re.Match], datetime]]] = [
+    (
+        re.compile(
+            r"(\d{4})-(\d{1,2})-(\d{1,2})(?:\s+(\d{1,2}):(\d{1,2})(?::(\d{1,2}))?)?"
+        ),
+        _build_ymd,
+    ),
+    (
+        re.compile(r"(\d{4})/(\d{1,2})/(\d{1,2})(?:\s+(\d{1,2}):(\d{1,2}):(\d{1,2}))?"),
+        _build_ymd,
+    ),
+    (re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})"), _build_dmy),
+    (
+        re.compile(
+            r"([^\W\d_]+)\s+(\d{1,2}),\s+(\d{4})"
+            r"(?:\s+(\d{1,2}):(\d{1,2})(?::(\d{1,2}))?\s+([ap]m))?",
+            re.IGNORECASE,
+        ),
+        _build_month_name,
+    ),
+    (
+        re.compile(
+            r"(\d{4})-(\d{1,2})-(\d{1,2})T(\d{1,2}):(\d{1,2}):(\d{1,2})Z?",
+            re.IGNORECASE,
+        ),
+        _build_ymd,
+    ),
+    (re.compile(r"\d{4}-\d{2}-\d{2}.*"), _build_iso),
+]
+
+_SHAPE_TABLE = str.maketrans("123456789", "000000000")
+
+
+@lru_cache(maxsize=1024)
+def _rule_for_shape(shape: str) -> int | None:
+    """Index of the first rule whose pattern matches strings of this shape.
+
+    The shape keeps every character except ASCII digits, which the patterns
+    only ever match as a class, so all strings of one shape share a rule.
+    """
+    for i, (pattern, _) in enumerate(_PARSE_RULES):
+        if pattern.fullmatch(shape):
+            return i
+    return None
+
+
+def _parse_fallback(s: str) -> datetime:
+    """Trial-and-error parse over DATETIME_FORMATS, then ISO 8601."""
+    for fmt in DATETIME_FORMATS:
         try:
             return datetime.strptime(s, fmt)
         except ValueError:
+            if _profile is not None:
+                _profile.counters["strptime_misses"] += 1
             continue
 
     # Try ISO format with timezone
@@ -210,9 +699,142 @@ def parse_datetime(s: str) -> datetime:
     except ValueError:
         pass
 
+    if _profile is not None:
+        _profile.counters["parse_failures"] += 1
     raise ValueError(f"Could not parse date: {s}")
 
 
+def parse_datetime(s: str) -> datetime:
+    """Parse datetime from various formats.
+
+    The input's shape (digits masked) picks a single rule, cached per shape,
+    so a homogeneous column parses without any failed attempts. Shapes no
+    rule knows, and values a rule rejects, go through _parse_fallback.
+    """
+    rule = _rule_for_shape(s.lower().translate(_SHAPE_TABLE))
+    if rule is not None:
+        pattern, build = _PARSE_RULES[rule]
+        m = pattern.fullmatch(s)
+        if m is not None:
+            try:
+                return build(m)
+            except ValueError:
+                pass
+    if _profile is not None:
+        _profile.counters["parse_fallbacks"] += 1
+    return _parse_fallback(s)
+
+
+RECUR_FREQS = ("daily", "weekly", "monthly")
+
+
+def _normalize(dt: datetime) -> datetime:
+    """Resolve wall times that fall in a DST gap to the real local time."""
+    if dt.tzinfo is None:
+        return dt
+    return dt.astimezone(timezone.utc).astimezone(dt.tzinfo)
+
+
+def recur(
+    start: datetime,
+    freq: str = "daily",
+    interval: int = 1,
+    weekdays: Iterable[int] | None = None,
+    until: datetime | None = None,
+) -> Iterator[datetime]:
+    """Return recurring datetimes lazily, in the wall-clock time of start.
+
+    Each occurrence is built from a calendar date plus start's wall time
+    (never by adding timedeltas to aware datetimes), so 09:00 stays 09:00
+    across DST changes. weekdays filters daily rules and picks the days of
+    weekly ones; monthly rules skip months without start's day (e.g. 31st).
+    The sequence ends at the last date datetime can represent. Invalid rules
+    raise ValueError here, before the first occurrence is requested.
+    """
+    if interval < 1:
+        raise ValueError("Interval must be at least 1")
+    if freq not in RECUR_FREQS:
+        raise ValueError(f"Unknown frequency: {freq}")
+    days = sorted(set(weekdays)) if weekdays else None
+    first = start.date()
+    if days and freq == "daily":
+        reachable = {(first.weekday() + k * interval) % 7 for k in range(7)}
+        if not reachable & set(days):
+            raise ValueError("No weekday in --on is reachable at this interval")
+    if days and freq == "monthly":
+        raise ValueError("Weekdays are not supported for monthly rules")
+
+    def dates() -> Iterator[date]:
+        if freq == "daily":
+            for k in count():
+                try:
+                    day = first + timedelta(days=k * interval)
+                except OverflowError:
+                    return
+                if not days or day.weekday() in days:
+                    yield day
+        elif freq == "weekly":
+            week = first - timedelta(days=first.weekday())
+            for k in count():
+                for weekday in days or [first.weekday()]:
+                    try:
+                        day = week + timedelta(weeks=k * interval, days=weekday)
+                    except OverflowError:
+                        return
+                    if day >= first:
+                        yield day
+        else:
+            for k in count():
+                years, month = divmod(first.month - 1 + k * interval, 12)
+                if first.year + years > MAXYEAR:
+                    return
+                try:
+                    yield date(first.year + years, month + 1, first.day)
+                except ValueError:
+                    continue
+
+    def occurrences() -> Iterator[datetime]:
+        for day in dates():
+            try:
+                occurrence = _normalize(
+                    datetime.combine(day, start.time(), start.tzinfo)
+                )
+            except OverflowError:
+                return  # the last day's wall time is past datetime.max in UTC
+            if until is not None and occurrence > until:
+                return
+            yield occurrence
+
+    return occurrences()
+
+
+def cmd_recur(args: argparse.Namespace) -> None:
+    """Expand a recurrence rule and show occurrences in one or more zones."""
+    tz = resolve_tz(args.tz)
+    show = [resolve_tz(tz_str) for tz_str in args.show]
+
+    def localize(dt: datetime) -> datetime:
+        return dt.astimezone(tz) if dt.tzinfo else dt.replace(tzinfo=tz)
+
+    start = localize(parse_datetime(args.start))
+    until = localize(parse_datetime(args.until)) if args.until else None
+    weekdays = parse_weekdays(args.on) if args.on else None
+    # Without --until, default to a handful of occurrences rather than forever
+    limit = args.limit if args.limit is not None or until else 10
+
+    try:
+        occurrences = recur(start, args.freq, args.interval, weekdays, until)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    width = len(format_dt(start))
+    print("  ".join(name.ljust(width) for name in [args.tz, *args.show]).rstrip())
+    for dt in islice(occurrences, limit):
+        columns = [dt, *(dt.astimezone(zone) for zone in show)]
+        print("  ".join(format_dt(c) for c in columns))
+
+
 def cmd_list_tz(args: argparse.Namespace) -> None:
     """List available timezones."""
     query = args.query.lower() if args.query else None
@@ -224,17 +846,585 @@ def cmd_list_tz(args: argparse.Namespace) -> None:
 
     if args.all:
         print("\nAll IANA timezones:")
-        for tz in sorted(available_timezones()):
+        with profiled("available_timezones"):
+            zones = available_timezones()
+        for tz in sorted(zones):
             if not query or query in tz.lower():
                 print(f"  {tz}")
 
 
-def main() -> None:
+BATCH_OUTPUT_FORMATS = ("iso", "display", "epoch")
+
+
+def convert_value(
+    s: str, from_tz: ZoneInfo, to_tz: ZoneInfo, out_fmt: str = "iso"
+) -> str:
+    """Parse one value, convert it to to_tz and format it.
+
+    Naive inputs are interpreted in from_tz; explicit offsets are respected.
+    """
+    dt = parse_datetime(s.strip())
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=from_tz)
+
+    converted = dt.astimezone(to_tz)
+
+    if out_fmt == "display":
+        return format_dt(converted)
+    if out_fmt == "epoch":
+        return str(int(converted.timestamp()))
+    return converted.isoformat()
+
+
+def _convert_chunk(
+    values: list[str], from_name: str, to_name: str, out_fmt: str, epoch: bool
+) -> list[tuple[str | None, str | None]]:
+    """Convert a chunk of values, returning (result, error) pairs.
+
+    Top-level so it can be shipped to worker processes; zones are passed by
+    name and resolved through the per-process cache.
+    """
+    if epoch:
+        return _convert_epoch_chunk(values, to_name, out_fmt)
+
+    from_tz = resolve_tz(from_name)
+    to_tz = resolve_tz(to_name)
+    results: list[tuple[str | None, str | None]] = []
+    for value in values:
+        try:
+            results.append((convert_value(value, from_tz, to_tz, out_fmt), None))
+        except (ValueError, OverflowError) as e:
+            results.append((None, str(e)))
+    return results
+
+
+def _convert_epoch_chunk(
+    values: list[str], to_name: str, out_fmt: str
+) -> list[tuple[str | None, str | None]]:
+    """Convert a chunk of Unix timestamps with one OffsetTable lookup."""
+    stamps: list[float] = []
+    errors: dict[int, str] = {}
+    for i, value in enumerate(values):
+        try:
+            ts = float(value)
+        except ValueError as e:
+            errors[i] = str(e)
+            ts = 0.0
+        stamps.append(ts / 1000 if ts > 1e12 else ts)  # milliseconds
+
+    offsets = offset_table(to_name).offsets_for(stamps)
+
+    results: list[tuple[str | None, str | None]] = []
+    for i, (ts, offset) in enumerate(zip(stamps, offsets)):
+        if i in errors:
+            results.append((None, errors[i]))
+            continue
+        if offset is None:
+            results.append((None, f"Timestamp out of range: {values[i]}"))
+            continue
+        try:
+            local = datetime.fromtimestamp(ts, timezone(timedelta(seconds=offset)))
+        except (OverflowError, OSError, ValueError) as e:
+            results.append((None, str(e)))
+            continue
+        if out_fmt == "display":
+            results.append((format_dt(local), None))
+        elif out_fmt == "epoch":
+            results.append((str(int(ts)), None))
+        else:
+            results.append((local.isoformat(), None))
+    return results
+
+
+def _business_chunk(
+    values: list[Any], op: str, n: int, weekend: str, holidays: str | None
+) -> list[tuple[str | None, str | None]]:
+    """Business-day counts ("diff", values are (start, end)) or offsets ("add")."""
+    cal = load_calendar(weekend, holidays)
+    results: list[tuple[str | None, str | None]] = []
+    for value in values:
+        try:
+            if op == "diff":
+                start, end = (parse_datetime(v.strip()).date() for v in value)
+                results.append((str(cal.count(start, end)), None))
+            else:
+                start = parse_datetime(value.strip()).date()
+                results.append((cal.offset(start, n).isoformat(), None))
+        except (ValueError, OverflowError) as e:
+            results.append((None, str(e)))
+    return results
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    """Yield successive lists of up to size items."""
+    it = iter(items)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def ordered_map(
+    fn: Callable[[Any], Any], items: Iterable[Any], workers: int = 1
+) -> Iterator[Any]:
+    """Map fn over items in order, optionally across a process pool.
+
+    At most 2 * workers items are in flight, so memory stays bounded no
+    matter how long the input stream is. When profiling, each call is a
+    "chunk" latency sample, timed in whichever process runs it.
+    """
+    if workers <= 1:
+        for item in items:
+            if _profile is None:
+                yield fn(item)
+                continue
+            started = time.perf_counter()
+            result = fn(item)
+            _profile.sample("chunk", time.perf_counter() - started)
+            yield result
+        return
+
+    # Imported here so single-process commands do not pay for it at startup
+    from concurrent.futures import ProcessPoolExecutor
+
+    def result_of(future) -> Any:
+        if _profile is None:
+            return future.result()
+        result, snapshot = future.result()
+        _profile.merge(snapshot)
+        return result
+
+    if _profile is not None:
+        fn = partial(_call_profiled, partial(_timed_chunk, fn))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque = deque()
+        for item in items:
+            pending.append(pool.submit(fn, item))
+            if len(pending) >= workers * 2:
+                yield result_of(pending.popleft())
+        while pending:
+            yield result_of(pending.popleft())
+
+
+def _timed_chunk(fn: Callable[[Any], Any], item: Any) -> Any:
+    """fn(item), recorded as a "chunk" sample (for profiled pool workers)."""
+    started = time.perf_counter()
+    result = fn(item)
+    _profile.sample("chunk", time.perf_counter() - started)
+    return result
+
+
+def read_records(
+    stream: TextIO, fmt: str, field: str | None, end_field: str | None = None
+) -> Iterator[tuple[Any, Any]]:
+    """Yield (record, value) pairs from a lines, CSV or JSONL stream.
+
+    With end_field, value is a (field, end_field) pair of strings. JSONL
+    lines that are not JSON objects yield the raw line with a None value.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        key = field or (reader.fieldnames or [""])[0]
+        for name in (key, end_field):
+            if name and reader.fieldnames and name not in reader.fieldnames:
+                raise ValueError(f"Column not found: {name}")
+        for row in reader:
+            if end_field:
+                yield row, (row.get(key) or "", row.get(end_field) or "")
+            else:
+                yield row, row.get(key) or ""
+    elif fmt == "jsonl":
+        if not field:
+            raise ValueError("--field is required for JSONL input")
+        for line in stream:
+            if line.strip():
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                if not isinstance(record, dict):
+                    yield line.strip(), None
+                    continue
+                value = record.get(field)
+                value = "" if value is None else str(value)
+                if end_field:
+                    end = record.get(end_field)
+                    yield record, (value, "" if end is None else str(end))
+                else:
+                    yield record, value
+    elif end_field:
+        raise ValueError("--business-diff needs CSV or JSONL input")
+    else:
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield line, line
+
+
+def write_record(
+    out: TextIO, fmt: str, record: Any, result: str | None, out_field: str, state: dict
+) -> None:
+    """Write one converted record in the same format it was read."""
+    if fmt == "csv":
+        writer = state.get("writer")
+        if writer is None:
+            writer = csv.DictWriter(out, fieldnames=[*record.keys(), out_field])
+            writer.writeheader()
+            state["writer"] = writer
+        writer.writerow({**record, out_field: result or ""})
+    elif fmt == "jsonl":
+        if isinstance(record, str):
+            out.write(record + "\n")  # not an object; pass it through
+            return
+        record[out_field] = result
+        out.write(json.dumps(record) + "\n")
+    else:
+        out.write((result or "") + "\n")
+
+
+def cmd_batch(args: argparse.Namespace) -> None:
+    """Convert a stream of datetimes (lines, CSV column or JSONL field)."""
+    src = sys.stdin
+    out = sys.stdout
+
+    converted = errors = 0
+    state: dict = {}
+    try:
+        # Validate zones up front so a typo fails before any output is written
+        resolve_tz(args.from_tz)
+        resolve_tz(args.to_tz)
+
+        if args.business_diff or args.business_add is not None:
+            load_calendar(args.weekend, args.holidays)  # fail early on a bad spec
+            convert = partial(
+                _business_chunk,
+                op="diff" if args.business_diff else "add",
+                n=args.business_add or 0,
+                weekend=args.weekend,
+                holidays=args.holidays,
+            )
+        else:
+            convert = partial(
+                _convert_chunk,
+                from_name=args.from_tz,
+                to_name=args.to_tz,
+                out_fmt=args.output_format,
+                epoch=args.epoch,
+            )
+
+        if args.input:
+            src = open(args.input, newline="")
+        records = read_records(src, args.format, args.field, args.business_diff)
+        chunks = chunked(records, args.chunk_size)
+        # Records stay in this process; only the raw values go to workers
+        pending: deque = deque()
+
+        def values() -> Iterator[list[str]]:
+            for chunk in chunks:
+                pending.append(chunk)
+                yield [value for _, value in chunk if value is not None]
+
+        for results in ordered_map(convert, values(), args.workers):
+            chunk = pending.popleft()
+            converted_values = iter(results)
+            for record, value in chunk:
+                if value is None:
+                    result, error = None, "Not a JSON object"
+                else:
+                    result, error = next(converted_values)
+                if error:
+                    errors += 1
+                    print(
+                        f"Record {converted + errors}: Error - {error}", file=sys.stderr
+                    )
+                else:
+                    converted += 1
+                write_record(out, args.format, record, result, args.out_field, state)
+            out.flush()
+    except (ValueError, OSError) as e:  # bad zone, calendar or input file
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+
+    print(f"Converted {converted} records ({errors} errors)", file=sys.stderr)
+
+
+_EPOCH = datetime(1970, 1, 1)
+_UNIX_EPOCH_ORDINAL = _EPOCH.toordinal()
+# Local seconds that still map back to a datetime (for bucket labels)
+_MIN_LOCAL = (datetime.min - _EPOCH) // timedelta(seconds=1)
+_MAX_LOCAL = (datetime.max - _EPOCH) // timedelta(seconds=1)
+
+# Calendar buckets and their label formats; fixed sizes like '15m' use the
+# minute label (or seconds, if the size is not a whole number of minutes)
+AGGREGATE_BUCKETS = {
+    "minute": "%Y-%m-%d %H:%M",
+    "hour": "%Y-%m-%d %H:00",
+    "day": "%Y-%m-%d",
+    "week": "%Y-%m-%d",
+    "month": "%Y-%m",
+    "year": "%Y",
+}
+_UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def bucket_function(spec: str) -> tuple[Callable[[int], int], str]:
+    """Return (key function, label format) for a bucket spec.
+
+    Keys are local wall-clock seconds since 1970-01-01 of the bucket start;
+    weeks start on Monday. Fixed sizes under a day restart at each local
+    midnight (7h gives 00:00, 07:00, 14:00, 21:00); longer ones count from
+    1970-01-01.
+    """
+    spec = spec.lower()
+    if spec in ("month", "year"):
+
+        def key(local: int) -> int:
+            day = date.fromordinal(_UNIX_EPOCH_ORDINAL + local // 86400)
+            start = date(day.year, 1 if spec == "year" else day.month, 1)
+            return (start.toordinal() - _UNIX_EPOCH_ORDINAL) * 86400
+
+        return key, AGGREGATE_BUCKETS[spec]
+    if spec == "week":
+        week = 7 * 86400
+        # 1970-01-01 was a Thursday, three days after a Monday
+        return (lambda local: local - (local + 3 * 86400) % week), "%Y-%m-%d"
+
+    size = {"minute": 60, "hour": 3600, "day": 86400}.get(spec)
+    if size is None:
+        m = re.fullmatch(r"(\d+)([smhd])", spec)
+        if not m or not int(m.group(1)):
+            raise ValueError(f"Unknown bucket: {spec}")
+        size = int(m.group(1)) * _UNIT_SECONDS[m.group(2)]
+    label = AGGREGATE_BUCKETS.get(spec) or (
+        "%Y-%m-%d %H:%M" if size % 60 == 0 else "%Y-%m-%d %H:%M:%S"
+    )
+    if size < 86400:
+        return (lambda local: local - local % 86400 % size), label
+    return (lambda local: local - local % size), label
+
+
+def local_seconds(
+    values: list[str], from_tz: ZoneInfo, to_name: str, epoch: bool
+) -> Iterator[int | str]:
+    """Yield local wall-clock seconds in to_name for each value.
+
+    Unparseable or out-of-range values yield their error message instead.
+    """
+    if epoch:
+        stamps: list[float] = []
+        errors: dict[int, str] = {}
+        for i, value in enumerate(values):
+            try:
+                ts = float(value)
+            except ValueError as e:
+                errors[i] = str(e)
+                ts = 0.0
+            stamps.append(ts / 1000 if ts > 1e12 else ts)  # milliseconds
+        offsets = offset_table(to_name).offsets_for(stamps)
+        for i, (ts, offset) in enumerate(zip(stamps, offsets)):
+            if i in errors:
+                yield errors[i]
+            elif offset is None or not _MIN_LOCAL <= ts + offset <= _MAX_LOCAL:
+                yield f"Timestamp out of range: {values[i]}"  # also nan
+            else:
+                yield math.floor(ts + offset)
+        return
+
+    to_tz = resolve_tz(to_name)
+    for value in values:
+        try:
+            dt = parse_datetime(value.strip())
+        except ValueError as e:
+            yield str(e)
+            continue
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=from_tz)
+        try:
+            local = dt.astimezone(to_tz).replace(tzinfo=None)
+        except OverflowError as e:
+            yield str(e)
+            continue
+        yield math.floor((local - _EPOCH).total_seconds())
+
+
+def cmd_aggregate(args: argparse.Namespace) -> None:
+    """Count timestamps per local time bucket in one pass."""
+    counts: Counter = Counter()
+    total = errors = 0
+    src = sys.stdin
+    try:
+        from_tz = resolve_tz(args.from_tz)
+        resolve_tz(args.tz)
+        key, label_format = bucket_function(args.bucket)
+        if args.input:
+            src = open(args.input, newline="")
+        records = read_records(src, args.format, args.field)
+        for chunk in chunked((value for _, value in records), args.chunk_size):
+            started = time.perf_counter()
+            values = [value for value in chunk if value is not None]
+            locals_ = local_seconds(values, from_tz, args.tz, args.epoch)
+            for value in chunk:
+                local = "Not a JSON object" if value is None else next(locals_)
+                if isinstance(local, str):
+                    errors += 1
+                    print(f"Record {total + errors}: Error - {local}", file=sys.stderr)
+                else:
+                    total += 1
+                    counts[key(local)] += 1
+            if _profile is not None:
+                _profile.sample("chunk", time.perf_counter() - started)
+    except (ValueError, OSError) as e:  # bad zone, bucket or input file
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+
+    if args.top:
+        rows = counts.most_common(args.top)
+    else:
+        rows = sorted(counts.items())
+
+    def label(bucket: int) -> str:
+        return (_EPOCH + timedelta(seconds=bucket)).strftime(label_format)
+
+    if args.csv:
+        writer = csv.writer(sys.stdout)
+        writer.writerow(["bucket", "count"])
+        writer.writerows((label(bucket), n) for bucket, n in rows)
+    else:
+        peak = max(counts.values(), default=0)
+        width = max((len(label(bucket)) for bucket, _ in rows), default=0)
+        for bucket, n in rows:
+            bar = "#" * max(1, round(n / peak * args.width))
+            print(f"{label(bucket):{width}}  {n:>8}  {bar}")
+        print(f"\nTotal: {total} in {len(counts)} buckets ({args.tz})")
+
+    if errors:
+        print(f"Skipped {errors} unparseable records", file=sys.stderr)
+
+
+SERVE_COMMANDS = ("now", "convert", "diff", "add", "timestamp", "parse", "recur")
+
+
+def handle_request(parser: argparse.ArgumentParser, line: str | bytes) -> dict:
+    """Run one JSON-line request through the regular cmd_* handlers.
+
+    Output the handler prints is captured and returned in the response.
+    Handlers run synchronously, so redirecting stdout is safe even with
+    several clients connected to the event loop.
+    """
+    response: dict[str, Any] = {}
+    out, err = io.StringIO(), io.StringIO()
+    try:
+        request = json.loads(line)
+        if not isinstance(request, dict):
+            raise ValueError("Request must be a JSON object")
+        response["id"] = request.get("id")
+        command = request.get("command")
+        if command not in SERVE_COMMANDS:
+            raise ValueError(f"Unsupported command: {command}")
+        argv = [command, *(str(a) for a in request.get("args", []))]
+        with redirect_stdout(out), redirect_stderr(err), profiled(f"serve_{command}"):
+            args = parser.parse_args(argv)
+            args.func(args)
+    except SystemExit as e:
+        # argparse exits after printing --help (0) or a usage error (2)
+        if e.code:
+            response.update(ok=False, error=err.getvalue().strip())
+            return response
+    except Exception as e:
+        # One bad request (missing holidays file, out-of-range date, ...)
+        # must not take the server down with it
+        response.update(ok=False, error=str(e) or type(e).__name__)
+        return response
+
+    response.update(ok=True, output=out.getvalue())
+    if err.getvalue():
+        response["stderr"] = err.getvalue()
+    return response
+
+
+async def _serve_socket(parser: argparse.ArgumentParser, path: str) -> None:
+    """Serve JSON-line requests to any number of clients on a Unix socket."""
+    import asyncio  # only serve needs it; keeps one-shot commands fast
+
+    async def client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while line := await reader.readline():
+                if line.strip():
+                    response = handle_request(parser, line)
+                    writer.write(json.dumps(response).encode() + b"\n")
+                    await writer.drain()
+        finally:
+            writer.close()
+
+    server = await asyncio.start_unix_server(client, path=path)
+    print(f"Listening on {path}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def cmd_serve(args: argparse.Namespace) -> None:
+    """Keep caches warm and answer requests as JSON lines."""
+    parser = build_parser()
+    _tz_index()  # warm the zone index before the first request
+
+    try:
+        if args.socket:
+            socket_path = Path(args.socket)
+            if socket_path.is_socket():
+                socket_path.unlink()  # stale socket from a previous run
+            # Exit through the finally below so the socket file is removed
+            signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+            import asyncio
+
+            try:
+                asyncio.run(_serve_socket(parser, args.socket))
+            finally:
+                socket_path.unlink(missing_ok=True)
+        else:
+            for line in sys.stdin:
+                if line.strip():
+                    response = handle_request(parser, line)
+                    print(json.dumps(response), flush=True)
+    except KeyboardInterrupt:
+        pass
+
+
+def positive_int(value: str) -> int:
+    """argparse type for options that must be at least 1."""
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {n}")
+    return n
+
+
+def non_negative_int(value: str) -> int:
+    """argparse type for counts that may be 0 but not negative."""
+    n = int(value)
+    if n < 0:
+        raise argparse.ArgumentTypeError(f"must not be negative, got {n}")
+    return n
+
+
+def add_calendar_args(parser: argparse.ArgumentParser) -> None:
+    """Add the business-calendar options shared by diff, add and batch."""
+    parser.add_argument(
+        "--weekend", default="sat,sun", help="Weekend days (default: sat,sun)"
+    )
+    parser.add_argument("--holidays", help="File with one holiday date per line")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line parser (also used by serve for each request)."""
     parser = argparse.ArgumentParser(
         description="Datetime utility for timezone conversions and calculations",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog=__doc__,
     )
+    add_profile_args(parser, "phase timings, counters and cache hit rates")
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     # now
@@ -255,6 +1445,10 @@ def main() -> None:
     p_diff = subparsers.add_parser("diff", help="Calculate duration between dates")
     p_diff.add_argument("start", help="Start date")
     p_diff.add_argument("end", help="End date")
+    p_diff.add_argument(
+        "--business", action="store_true", help="Also count business days"
+    )
+    add_calendar_args(p_diff)
     p_diff.set_defaults(func=cmd_diff)
 
     # add
@@ -264,6 +1458,10 @@ def main() -> None:
     p_add.add_argument("--weeks", type=int, help="Weeks to add")
     p_add.add_argument("--hours", type=int, help="Hours to add")
     p_add.add_argument("--minutes", type=int, help="Minutes to add")
+    p_add.add_argument(
+        "--business", action="store_true", help="Count --days as business days"
+    )
+    add_calendar_args(p_add)
     p_add.set_defaults(func=cmd_add)
 
     # timestamp
@@ -277,14 +1475,134 @@ def main() -> None:
     p_parse.add_argument("input", help="Date string to parse")
     p_parse.set_defaults(func=cmd_parse)
 
+    # recur
+    p_recur = subparsers.add_parser("recur", help="Expand a recurring time")
+    p_recur.add_argument("start", help="First occurrence (wall time in --tz)")
+    p_recur.add_argument(
+        "--freq", choices=RECUR_FREQS, default="daily", help="Recurrence frequency"
+    )
+    p_recur.add_argument(
+        "--interval",
+        type=positive_int,
+        default=1,
+        help="Repeat every N days/weeks/months",
+    )
+    p_recur.add_argument("--on", help="Weekdays, e.g. 'mon,wed,fri'")
+    p_recur.add_argument("--tz", default="UTC", help="Timezone of the rule")
+    p_recur.add_argument(
+        "--show", nargs="+", default=[], help="Also show occurrences in these zones"
+    )
+    p_recur.add_argument(
+        "--limit", type=non_negative_int, help="Maximum occurrences (default: 10)"
+    )
+    p_recur.add_argument("--until", help="Last possible occurrence")
+    p_recur.set_defaults(func=cmd_recur)
+
     # list-tz
     p_list = subparsers.add_parser("list-tz", help="List timezones")
     p_list.add_argument("query", nargs="?", help="Filter timezones")
     p_list.add_argument("--all", action="store_true", help="Show all IANA timezones")
     p_list.set_defaults(func=cmd_list_tz)
 
+    # batch
+    p_batch = subparsers.add_parser("batch", help="Convert a stream of datetimes")
+    p_batch.add_argument("input", nargs="?", help="Input file (default: stdin)")
+    p_batch.add_argument(
+        "--format",
+        choices=["lines", "csv", "jsonl"],
+        default="lines",
+        help="Input/output record format",
+    )
+    p_batch.add_argument(
+        "--field", help="CSV column or JSONL field to convert (CSV: first column)"
+    )
+    p_batch.add_argument(
+        "--out-field", default="converted", help="Column/field for the result"
+    )
+    p_batch.add_argument(
+        "--from", dest="from_tz", default="UTC", help="Timezone for naive inputs"
+    )
+    p_batch.add_argument("--to", dest="to_tz", default="UTC", help="Target timezone")
+    p_batch.add_argument(
+        "--output-format",
+        choices=BATCH_OUTPUT_FORMATS,
+        default="iso",
+        help="Result format",
+    )
+    p_batch.add_argument(
+        "--epoch", action="store_true", help="Inputs are Unix timestamps"
+    )
+    p_batch.add_argument(
+        "--business-diff",
+        metavar="END_FIELD",
+        help="Output business days between --field and END_FIELD",
+    )
+    p_batch.add_argument(
+        "--business-add",
+        type=int,
+        metavar="N",
+        help="Output the date N business days after --field",
+    )
+    add_calendar_args(p_batch)
+    p_batch.add_argument(
+        "--workers", type=int, default=1, help="Worker processes (default: 1)"
+    )
+    p_batch.add_argument(
+        "--chunk-size", type=positive_int, default=1000, help="Records per work unit"
+    )
+    p_batch.set_defaults(func=cmd_batch)
+
+    # aggregate
+    p_agg = subparsers.add_parser(
+        "aggregate", help="Count timestamps per local time bucket"
+    )
+    p_agg.add_argument("input", nargs="?", help="Input file (default: stdin)")
+    p_agg.add_argument(
+        "--format",
+        choices=["lines", "csv", "jsonl"],
+        default="lines",
+        help="Input record format",
+    )
+    p_agg.add_argument(
+        "--field", help="CSV column or JSONL field to read (CSV: first column)"
+    )
+    p_agg.add_argument("--tz", default="UTC", help="Timezone for bucket boundaries")
+    p_agg.add_argument(
+        "--from", dest="from_tz", default="UTC", help="Timezone for naive inputs"
+    )
+    p_agg.add_argument(
+        "--bucket",
+        default="hour",
+        help="minute, hour, day, week, month, year or a size like 15m/6h",
+    )
+    p_agg.add_argument(
+        "--epoch", action="store_true", help="Inputs are Unix timestamps"
+    )
+    p_agg.add_argument("--top", type=int, help="Only show the N busiest buckets")
+    p_agg.add_argument("--csv", action="store_true", help="Output CSV")
+    p_agg.add_argument(
+        "--width", type=int, default=40, help="Histogram bar width (default: 40)"
+    )
+    p_agg.add_argument(
+        "--chunk-size", type=positive_int, default=1000, help="Records per lookup batch"
+    )
+    p_agg.set_defaults(func=cmd_aggregate)
+
+    # serve
+    p_serve = subparsers.add_parser(
+        "serve", help="Answer JSON-line requests on stdin or a Unix socket"
+    )
+    p_serve.add_argument("--socket", help="Unix socket path (default: stdin/stdout)")
+    p_serve.set_defaults(func=cmd_serve)
+
+    return parser
+
+
+def main() -> None:
+    parser = build_parser()
     args = parser.parse_args()
-    args.func(args)
+    with profiling(args):
+        args.func(args)
 
 
 if __name__ == "__main__":
@@ -4,47 +4,1078 @@
 Examples:
     uv run tools/pdf_util.py extract document.pdf
     uv run tools/pdf_util.py extract document.pdf --pages 1-5
+    uv run tools/pdf_util.py extract document.pdf --pages "1-3,50,last 10"
+    uv run tools/pdf_util.py extract document.pdf --workers 8
+    uv run tools/pdf_util.py extract archive.pdf --stream --max-rss 1024
     uv run tools/pdf_util.py info document.pdf
     uv run tools/pdf_util.py search document.pdf "search term"
+    uv run tools/pdf_util.py search document.pdf invoice receipt --first
+    uv run tools/pdf_util.py search document.pdf -E "INV-\\d{6}" -l
+    uv run tools/pdf_util.py search document.pdf total --pages=-5-
     uv run tools/pdf_util.py toc document.pdf
+    uv run tools/pdf_util.py scan ~/papers --workers 16 -o inventory.jsonl
+    uv run tools/pdf_util.py bulk-extract ~/papers ~/papers-text --workers 16
+    uv run tools/pdf_util.py bulk-extract ~/scans ~/scans-text --dedup
+    uv run tools/pdf_util.py cache stats
+    uv run tools/pdf_util.py index build ~/papers
+    uv run tools/pdf_util.py index query 'revenue "net income"'
+
+Extracted page text and outlines are cached in ~/.cache/pdf_util (or
+$XDG_CACHE_HOME/pdf_util), keyed by file content and pypdf version.
+Use --no-cache to bypass it.
+
+--profile (before the subcommand) reports where the time went as JSON:
+    uv run tools/pdf_util.py --profile extract document.pdf --workers 4 > /dev/null
 """
 
 import argparse
+import gc
+import glob
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import shutil
+import sqlite3
 import sys
+import time
+import weakref
+import zlib
+from array import array
+from bisect import bisect_right
+from collections import Counter, defaultdict, deque
+from collections.abc import Iterator, Sequence
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import closing, contextmanager, nullcontext
+from functools import partial
 from pathlib import Path
 
-from pypdf import PdfReader
+from pypdf import PageObject, PdfReader
+from pypdf import __version__ as pypdf_version
+from pypdf.generic import IndirectObject, StreamObject
+
+from profiler import Profiler, add_profile_args, peak_rss, profile_session
+
+DEFAULT_CACHE_DIR = (
+    Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "pdf_util"
+)
+CACHE_FILE = "text.sqlite3"
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, key TEXT
+);
+CREATE TABLE IF NOT EXISTS documents (
+    key TEXT PRIMARY KEY,
+    page_count INTEGER,
+    outline BLOB,
+    bytes INTEGER NOT NULL DEFAULT 0,
+    last_used REAL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    key TEXT, page INTEGER, text BLOB, PRIMARY KEY (key, page)
+);
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER);
+"""
+
+
+_profile: Profiler | None = None
+
+
+def profiled(name: str):
+    """Context manager timing a phase when profiling, else a no-op."""
+    return _profile.phase(name) if _profile is not None else nullcontext()
+
+
+_worker_startup: dict | None = None  # profile of a pool worker's initializer
+
+
+def _call_profiled(fn, *args):
+    """Run fn in a pool worker under a fresh Profiler; return (result, state).
+
+    The first call in a worker also carries the profile of its initializer.
+    """
+    global _profile, _worker_startup
+    _profile = Profiler()
+    if _worker_startup is not None:
+        _profile.merge(_worker_startup)
+        _worker_startup = None
+    return fn(*args), _profile.snapshot()
+
+
+def submit(pool: ProcessPoolExecutor, fn, *args):
+    """pool.submit(fn, *args), bringing the worker's profile back if profiling."""
+    if _profile is None:
+        return pool.submit(fn, *args)
+    return pool.submit(_call_profiled, fn, *args)
+
+
+def result_of(future):
+    """future.result() for a future from submit(), merging its profile."""
+    if _profile is None:
+        return future.result()
+    result, snapshot = future.result()
+    _profile.merge(snapshot)
+    return result
+
+
+@contextmanager
+def profiling(args: argparse.Namespace) -> Iterator[None]:
+    """Run a command under the profiling options given (see profile_session)."""
+    global _profile
+    try:
+        with profile_session(args) as _profile:
+            yield
+    finally:
+        _profile = None
+
+
+def file_digest(file: Path) -> str:
+    """SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file, "rb") as f:
+        while block := f.read(1 << 20):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class TextCache:
+    """SQLite cache of extracted page text and outlines.
+
+    Documents are keyed by the SHA-256 of the file plus the pypdf version,
+    so both edits and pypdf upgrades miss. Page text is stored compressed;
+    whole documents are evicted least-recently-used past max_bytes.
+    """
+
+    def __init__(self, path: Path, max_bytes: int) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = self.misses = 0
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.executescript(CACHE_SCHEMA)
+
+    def key_for(self, file: Path) -> str:
+        """Content key for a file; only re-hashed when its size/mtime change."""
+        path = str(file.resolve())
+        st = file.stat()
+        row = self.db.execute(
+            "SELECT key FROM files WHERE path = ? AND mtime_ns = ? AND size = ?",
+            (path, st.st_mtime_ns, st.st_size),
+        ).fetchone()
+        if row:
+            key = row[0]
+        else:
+            key = f"{file_digest(file)}:{pypdf_version}"
+            with self.db:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                    (path, st.st_mtime_ns, st.st_size, key),
+                )
+        with self.db:
+            self.db.execute("INSERT OR IGNORE INTO documents (key) VALUES (?)", (key,))
+            self.db.execute(
+                "UPDATE documents SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+        return key
+
+    def page_count(self, key: str) -> int | None:
+        row = self.db.execute(
+            "SELECT page_count FROM documents WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_page_count(self, key: str, count: int) -> None:
+        with self.db:
+            self.db.execute(
+                "UPDATE documents SET page_count = ? WHERE key = ?", (count, key)
+            )
+
+    def get_pages(self, key: str, pages: Sequence[int]) -> dict[int, str]:
+        """Cached text for the requested page indices that are present."""
+        if not pages:
+            return {}
+        wanted = set(pages)
+        low, high = min(pages), max(pages)
+        if len(wanted) * 4 >= high - low + 1:
+            rows = self.db.execute(
+                "SELECT page, text FROM pages WHERE key = ? AND page BETWEEN ? AND ?",
+                (key, low, high),
+            ).fetchall()
+        else:  # sparse selection: fetch only those pages
+            ordered = sorted(wanted)
+            rows = []
+            for i in range(0, len(ordered), 500):
+                chunk = ordered[i : i + 500]
+                rows += self.db.execute(
+                    "SELECT page, text FROM pages WHERE key = ? "
+                    f"AND page IN ({', '.join('?' * len(chunk))})",
+                    (key, *chunk),
+                ).fetchall()
+        found = {
+            page: zlib.decompress(blob).decode()
+            for page, blob in rows
+            if page in wanted
+        }
+        self.hits += len(found)
+        self.misses += len(wanted) - len(found)
+        return found
+
+    def put_pages(self, key: str, items: Sequence[tuple[int, str]]) -> None:
+        blobs = [(key, page, zlib.compress(text.encode())) for page, text in items]
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO pages VALUES (?, ?, ?)", blobs)
+            self._update_bytes(key)
+
+    def get_outline(self, key: str) -> list | None:
+        row = self.db.execute(
+            "SELECT outline FROM documents WHERE key = ?", (key,)
+        ).fetchone()
+        if not row or row[0] is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(zlib.decompress(row[0]))
+
+    def put_outline(self, key: str, outline: list) -> None:
+        blob = zlib.compress(json.dumps(outline).encode())
+        with self.db:
+            self.db.execute(
+                "UPDATE documents SET outline = ? WHERE key = ?", (blob, key)
+            )
+            self._update_bytes(key)
+
+    def _update_bytes(self, key: str) -> None:
+        """Recount a document's stored size (pages may have been replaced)."""
+        self.db.execute(
+            "UPDATE documents SET bytes = COALESCE(LENGTH(outline), 0) + "
+            "(SELECT COALESCE(SUM(LENGTH(text)), 0) FROM pages WHERE key = ?) "
+            "WHERE key = ?",
+            (key, key),
+        )
+
+    def evict(self) -> int:
+        """Drop least-recently-used documents until under max_bytes."""
+        total = self.db.execute("SELECT COALESCE(SUM(bytes), 0) FROM documents")
+        total = total.fetchone()[0]
+        evicted = 0
+        rows = self.db.execute(
+            "SELECT key, bytes FROM documents ORDER BY last_used"
+        ).fetchall()
+        with self.db:
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self.db.execute("DELETE FROM pages WHERE key = ?", (key,))
+                self.db.execute("DELETE FROM documents WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+        return evicted
+
+    def stats(self) -> dict:
+        counts = dict(self.db.execute("SELECT name, value FROM meta"))
+        return {
+            "path": str(self.path),
+            "documents": self.db.execute("SELECT COUNT(*) FROM documents").fetchone()[
+                0
+            ],
+            "pages": self.db.execute("SELECT COUNT(*) FROM pages").fetchone()[0],
+            "bytes": self.db.execute(
+                "SELECT COALESCE(SUM(bytes), 0) FROM documents"
+            ).fetchone()[0],
+            "max_bytes": self.max_bytes,
+            "hits": counts.get("hits", 0),
+            "misses": counts.get("misses", 0),
+        }
+
+    def clear(self) -> None:
+        with self.db:
+            for table in ("files", "documents", "pages", "meta"):
+                self.db.execute(f"DELETE FROM {table}")
+        self.db.execute("VACUUM")
+
+    def close(self) -> None:
+        with self.db:
+            for name, value in (("hits", self.hits), ("misses", self.misses)):
+                self.db.execute(
+                    "INSERT INTO meta VALUES (?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                    (name, value),
+                )
+        self.evict()
+        self.db.close()
+
+
+@contextmanager
+def open_cache(args: argparse.Namespace) -> Iterator[TextCache | None]:
+    """Open the text cache selected by the command-line options, if any.
+
+    A cache that cannot be opened (e.g. no writable home directory) is
+    reported once on stderr and the command runs without it.
+    """
+    if getattr(args, "no_cache", False):
+        yield None
+        return
+    path = Path(args.cache_dir) / CACHE_FILE
+    try:
+        cache = TextCache(path, args.cache_size * 2**20)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Warning: Text cache unavailable ({path}): {e}", file=sys.stderr)
+        cache = None
+    if cache is None:
+        yield None
+        return
+    try:
+        yield cache
+    finally:
+        if _profile is not None:
+            _profile.add_cache("text_cache", cache.hits, cache.misses)
+        cache.close()
+
+
+class PageDedup:
+    """Reuses extracted text for pages whose content is byte-identical.
+
+    A page's key hashes its content stream(s), its /Resources with
+    indirect objects resolved (so fonts and their ToUnicode maps count) and
+    its /Rotate: everything extract_text() reads. Streams are hashed as
+    stored, with their /Filter, so images are never decoded just to build
+    a key. Repeated cover sheets, letterheads and blank pages are then
+    extracted once per process. Keys are remembered for up to max_entries
+    pages, oldest dropped first; pages that cannot be keyed are extracted
+    as usual.
+    """
+
+    def __init__(self, max_entries: int = 10_000) -> None:
+        self.max_entries = max_entries
+        self.texts: dict[bytes, str] = {}
+        self.stats: Counter = Counter()
+        self._owner = None
+        self._memo: dict[tuple[int, int], bytes] = {}
+
+    def _feed(self, digest, obj, seen: set) -> None:
+        """Hash a PDF object canonically, independent of object numbers."""
+        if isinstance(obj, IndirectObject):
+            ref = (obj.idnum, obj.generation)
+            if ref not in self._memo:
+                if ref in seen:  # reference cycle
+                    digest.update(b"R ")
+                    return
+                seen.add(ref)
+                sub = hashlib.sha256()
+                self._feed(sub, obj.get_object(), seen)
+                self._memo[ref] = sub.digest()
+            digest.update(self._memo[ref])
+        elif isinstance(obj, dict):
+            digest.update(b"<<")
+            for key, value in sorted(dict.items(obj)):
+                digest.update(key.encode() + b" ")
+                self._feed(digest, value, seen)
+            if isinstance(obj, StreamObject):
+                digest.update(hashlib.sha256(obj._data).digest())
+            digest.update(b">>")
+        elif isinstance(obj, list):
+            digest.update(b"[")
+            for value in list.__iter__(obj):
+                self._feed(digest, value, seen)
+            digest.update(b"]")
+        else:
+            digest.update(repr(obj).encode() + b" ")
+
+    def page_key(self, page: PageObject) -> bytes:
+        # Object numbers are only meaningful within one reader
+        if self._owner is None or self._owner() is not page.pdf:
+            self._owner = weakref.ref(page.pdf)
+            self._memo = {}
+        digest = hashlib.sha256()
+        with profiled("dedup_hash"):
+            for name in ("/Contents", "/Resources", "/Rotate"):
+                self._feed(digest, dict.get(page, name), set())
+        return digest.digest()
+
+    def extract(self, page: PageObject) -> str:
+        """page.extract_text(), reusing the result for an identical page."""
+        try:
+            key = self.page_key(page)
+        except Exception:  # e.g. a broken object; extract_text may still work
+            key = None
+        self.stats["pages"] += 1
+        text = self.texts.get(key) if key is not None else None
+        if text is not None:
+            self.stats["reused"] += 1
+            if _profile is not None:
+                _profile.counters["dedup_reused"] += 1
+            return text
+        started = time.perf_counter()
+        text = page.extract_text()
+        elapsed = time.perf_counter() - started
+        self.stats["extract_seconds"] += elapsed
+        if _profile is not None:
+            _profile.sample("extract_text", elapsed)
+        if key is None:
+            return text
+        if len(self.texts) >= self.max_entries:
+            del self.texts[next(iter(self.texts))]
+        self.texts[key] = text
+        return text
+
+    def take_stats(self) -> Counter:
+        """Return the counters accumulated since the last call and reset them."""
+        stats, self.stats = self.stats, Counter()
+        return stats
+
+
+def dedup_report(stats: Counter) -> str:
+    """One-line summary of the extraction work saved by deduplication."""
+    pages, reused = stats["pages"], stats["reused"]
+    extracted = pages - reused
+    per_page = stats["extract_seconds"] / extracted if extracted else 0.0
+    saved = (reused + stats["duplicate_pages"]) * per_page
+    line = f"Dedup: {reused} of {pages} pages reused"
+    if pages:
+        line += f" ({reused / pages:.1%})"
+    if stats["files"]:
+        line += (
+            f", {stats['duplicate_files']} of {stats['files']} files were "
+            f"duplicates ({stats['duplicate_pages']} pages)"
+        )
+    return line + f"; ~{saved:.1f}s of extraction saved"
+
+
+# Per-process reader and dedup table for extraction workers
+_worker_reader: PdfReader | None = None
+_worker_dedup: PageDedup | None = None
+
+
+def worker_dedup() -> PageDedup:
+    """This process's PageDedup, created on first use."""
+    global _worker_dedup
+    if _worker_dedup is None:
+        _worker_dedup = PageDedup()
+    return _worker_dedup
+
+
+def open_reader(source: Path | mmap.mmap) -> PdfReader:
+    """PdfReader(source); the trailer and xref parse is the pdf_open phase."""
+    with profiled("pdf_open"):
+        return PdfReader(source)
+
+
+def extract_page(page: PageObject, dedup: PageDedup | None = None) -> str:
+    """page.extract_text(), through dedup if given, timed when profiling."""
+    if dedup is not None:
+        return dedup.extract(page)
+    if _profile is None:
+        return page.extract_text()
+    started = time.perf_counter()
+    text = page.extract_text()
+    _profile.sample("extract_text", time.perf_counter() - started)
+    return text
+
+
+def _init_worker(file: Path, profile: bool = False) -> None:
+    global _profile, _worker_reader, _worker_startup
+    _profile = Profiler() if profile else None
+    _worker_reader = open_reader(file)
+    if profile:
+        _worker_startup = _profile.snapshot()
+
+
+def _extract_pages(pages: list[int], dedup: bool = False) -> tuple[list[str], dict]:
+    """Extract text for the given pages with this worker's reader.
+
+    Returns the texts and, with dedup, the worker's dedup counters for them.
+    """
+    if not dedup:
+        return [extract_page(_worker_reader.pages[i]) for i in pages], {}
+    texts = [extract_page(_worker_reader.pages[i], worker_dedup()) for i in pages]
+    return texts, dict(worker_dedup().take_stats())
+
+
+def iter_page_texts(
+    file: Path,
+    reader: PdfReader | None,
+    pages: Sequence[int],
+    workers: int = 1,
+    dedup: PageDedup | None = None,
+) -> Iterator[tuple[int, str]]:
+    """Yield (page index, text) for the given pages, in the given order.
+
+    With workers > 1, chunks of pages are extracted in a process pool, each
+    worker opening its own PdfReader on the file (reader may then be None).
+    Results are yielded as soon as the leading chunks finish; at most
+    2 * workers chunks are in flight, and any still queued are cancelled if
+    the caller stops early. With dedup, identical pages are extracted once
+    (per worker) and counted in dedup.stats.
+    """
+    if workers <= 1:
+        reader = reader or open_reader(file)
+        for i in pages:
+            yield i, extract_page(reader.pages[i], dedup)
+        return
+
+    # Small chunks keep the first pages flowing and the pool balanced
+    size = max(1, min(8, -(-len(pages) // (workers * 4))))
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(file, _profile is not None),
+    )
+
+    def collect(chunk: Sequence[int], future) -> Iterator[tuple[int, str]]:
+        texts, stats = result_of(future)
+        if dedup:
+            dedup.stats.update(stats)
+        return zip(chunk, texts)
+
+    try:
+        pending: deque = deque()
+        for i in range(0, len(pages), size):
+            chunk = pages[i : i + size]
+            pending.append(
+                (chunk, submit(pool, _extract_pages, chunk, dedup is not None))
+            )
+            if len(pending) >= workers * 2:
+                yield from collect(*pending.popleft())
+        while pending:
+            yield from collect(*pending.popleft())
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def anon_rss() -> int | None:
+    """Anonymous resident memory in bytes (Linux /proc only; None elsewhere).
+
+    Unlike the full RSS this leaves out file-backed pages, such as those of
+    a memory-mapped PDF, which the kernel can reclaim at any time.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("RssAnon:"):
+                    return int(line.split()[1]) * 1024  # kB
+        with open("/proc/self/statm") as f:  # kernels before 4.5
+            resident, shared = f.read().split()[1:3]
+        return (int(resident) - int(shared)) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+@contextmanager
+def open_mapped(file: Path) -> Iterator[mmap.mmap]:
+    """Memory-map a file read-only.
+
+    PdfReader(path) reads the whole file into a BytesIO; a mapping lets the
+    OS page the file in and out instead.
+    """
+    with open(file, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield data
+
+
+def stream_page_texts(
+    data: mmap.mmap,
+    pages: Sequence[int],
+    window: int = 50,
+    max_rss: int | None = None,
+    dedup: PageDedup | None = None,
+) -> Iterator[tuple[int, str]]:
+    """Yield (page index, text) for the given pages in bounded memory.
+
+    Pages are read in windows, each with a fresh PdfReader over the mapped
+    file, so pypdf's parsed page and object caches are dropped between
+    windows. If anonymous RSS (see anon_rss) is above max_rss after a
+    window the window is halved; at a single page, MemoryError is raised.
+    """
+    i = 0
+    while i < len(pages):
+        reader = open_reader(data)
+        stop = min(i + window, len(pages))
+        for j in pages[i:stop]:
+            yield j, extract_page(reader.pages[j], dedup)
+        del reader
+        gc.collect()
+        i = stop
+
+        rss = anon_rss()
+        if max_rss and rss and rss > max_rss:
+            if window == 1:
+                raise MemoryError(
+                    f"Anonymous RSS {rss / 2**20:.0f} MB is over the "
+                    f"{max_rss / 2**20:.0f} MB ceiling"
+                )
+            window = max(1, window // 2)
+
+
+def outline_titles(items: list) -> list:
+    """Reduce a pypdf outline to nested lists of title strings."""
+    return [
+        (
+            outline_titles(item)
+            if isinstance(item, list)
+            else item.title if hasattr(item, "title") else str(item)
+        )
+        for item in items
+    ]
+
+
+class Document:
+    """A PDF file with a lazily opened reader and an optional TextCache."""
+
+    def __init__(self, file: Path, cache: TextCache | None = None) -> None:
+        self.file = file
+        self.cache = cache
+        self.key = cache.key_for(file) if cache else None
+        self._reader: PdfReader | None = None
+        self._page_count: int | None = None
+
+    @property
+    def reader(self) -> PdfReader:
+        if self._reader is None:
+            self._reader = open_reader(self.file)
+        return self._reader
+
+    @property
+    def page_count(self) -> int:
+        if self._page_count is None:
+            if self.cache:
+                self._page_count = self.cache.page_count(self.key)
+            if self._page_count is None:
+                self._page_count = len(self.reader.pages)
+                if self.cache:
+                    self.cache.set_page_count(self.key, self._page_count)
+        return self._page_count
+
+    def page_texts(
+        self, pages: Sequence[int], workers: int = 1, dedup: PageDedup | None = None
+    ) -> Iterator[tuple[int, str]]:
+        """Yield (page index, text) in order, extracting only cache misses."""
+        cached = self.cache.get_pages(self.key, pages) if self.cache else {}
+        missing = [i for i in pages if i not in cached]
+        reader = self.reader if missing and workers <= 1 else None
+        fresh = iter_page_texts(self.file, reader, missing, workers, dedup)
+
+        extracted: list[tuple[int, str]] = []
+        try:
+            for i in pages:
+                if i in cached:
+                    yield i, cached[i]
+                    continue
+                _, text = next(fresh)
+                extracted.append((i, text))
+                if self.cache and len(extracted) >= 32:
+                    self.cache.put_pages(self.key, extracted)
+                    extracted = []
+                yield i, text
+        finally:
+            # Also runs when the caller stops early
+            if self.cache and extracted:
+                self.cache.put_pages(self.key, extracted)
+
+    def outline(self) -> list:
+        """Outline as nested lists of titles (see outline_titles)."""
+        outline = self.cache.get_outline(self.key) if self.cache else None
+        if outline is None:
+            outline = outline_titles(self.reader.outline)
+            if self.cache:
+                self.cache.put_outline(self.key, outline)
+        return outline
+
+
+DEFAULT_INDEX = DEFAULT_CACHE_DIR / "index.sqlite3"
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY, path TEXT UNIQUE, mtime_ns INTEGER, size INTEGER,
+    digest TEXT
+);
+CREATE TABLE IF NOT EXISTS pages (
+    doc_id INTEGER, page INTEGER, length INTEGER, text BLOB,
+    PRIMARY KEY (doc_id, page)
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT, doc_id INTEGER, page INTEGER, positions BLOB
+);
+CREATE INDEX IF NOT EXISTS postings_term ON postings (term);
+CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);
+"""
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+class SearchIndex:
+    """Positional inverted index over PDF pages, ranked with BM25.
+
+    Each page is a retrieval unit. Postings store the token positions of a
+    term on a page, which also answers quoted phrase queries. Files are
+    re-indexed only when their size/mtime and content hash change.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.executescript(INDEX_SCHEMA)
+
+    def update(
+        self, root: Path, cache: TextCache | None = None, workers: int = 1
+    ) -> dict[str, int]:
+        """Index new and changed PDFs under root; drop ones that are gone."""
+        counts = {"indexed": 0, "pages": 0, "unchanged": 0, "removed": 0, "failed": 0}
+        seen = set()
+        files = sorted(p for p in root.rglob("*") if p.suffix.lower() == ".pdf")
+        for file in files:
+            path = str(file.resolve())
+            seen.add(path)
+            st = file.stat()
+            row = self.db.execute(
+                "SELECT id, mtime_ns, size, digest FROM docs WHERE path = ?", (path,)
+            ).fetchone()
+            if row and (row[1], row[2]) == (st.st_mtime_ns, st.st_size):
+                counts["unchanged"] += 1
+                continue
+            digest = file_digest(file)
+            if row and row[3] == digest:
+                with self.db:
+                    self.db.execute(
+                        "UPDATE docs SET mtime_ns = ?, size = ? WHERE id = ?",
+                        (st.st_mtime_ns, st.st_size, row[0]),
+                    )
+                counts["unchanged"] += 1
+                continue
+
+            try:
+                doc = Document(file, cache)
+                texts = list(doc.page_texts(range(doc.page_count), workers))
+            except Exception as e:
+                print(f"{file}: Error - {e}", file=sys.stderr)
+                counts["failed"] += 1
+                continue
+
+            with self.db, profiled("index_write"):
+                if row:
+                    self._delete(row[0])
+                doc_id = self.db.execute(
+                    "INSERT INTO docs (path, mtime_ns, size, digest) "
+                    "VALUES (?, ?, ?, ?)",
+                    (path, st.st_mtime_ns, st.st_size, digest),
+                ).lastrowid
+                for page, text in texts:
+                    self._add_page(doc_id, page, text or "")
+            counts["indexed"] += 1
+            counts["pages"] += len(texts)
+
+        prefix = str(root.resolve()).rstrip(os.sep) + os.sep
+        stale = [
+            (doc_id, path)
+            for doc_id, path in self.db.execute("SELECT id, path FROM docs")
+            if path.startswith(prefix) and path not in seen
+        ]
+        with self.db:
+            for doc_id, _ in stale:
+                self._delete(doc_id)
+        counts["removed"] = len(stale)
+        return counts
+
+    def _add_page(self, doc_id: int, page: int, text: str) -> None:
+        positions: dict[str, array] = defaultdict(lambda: array("I"))
+        tokens = tokenize(text)
+        for position, term in enumerate(tokens):
+            positions[term].append(position)
+        self.db.execute(
+            "INSERT INTO pages VALUES (?, ?, ?, ?)",
+            (doc_id, page, len(tokens), zlib.compress(text.encode())),
+        )
+        self.db.executemany(
+            "INSERT INTO postings VALUES (?, ?, ?, ?)",
+            ((term, doc_id, page, pos.tobytes()) for term, pos in positions.items()),
+        )
+
+    def _delete(self, doc_id: int) -> None:
+        for table, column in (("postings", "doc_id"), ("pages", "doc_id")):
+            self.db.execute(f"DELETE FROM {table} WHERE {column} = ?", (doc_id,))
+        self.db.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+
+    def _postings(
+        self, term: str, lengths: dict[tuple[int, int], int]
+    ) -> dict[tuple[int, int], array]:
+        """Token positions of term per page; page lengths go into lengths."""
+        result = {}
+        for doc_id, page, blob, length in self.db.execute(
+            "SELECT doc_id, page, positions, length FROM postings "
+            "JOIN pages USING (doc_id, page) WHERE term = ?",
+            (term,),
+        ):
+            positions = array("I")
+            positions.frombytes(blob)
+            result[doc_id, page] = positions
+            lengths[doc_id, page] = length
+        return result
+
+    def query(self, query: str, limit: int = 10) -> list[tuple[float, str, int, int]]:
+        """Return (score, path, doc_id, page) for the best-matching pages.
+
+        Quoted phrases must appear verbatim; every term adds to the score.
+        """
+        phrases = [tokenize(p) for p, _ in re.findall(r'"([^"]+)"|(\S+)', query) if p]
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        total, avg_length = self.db.execute(
+            "SELECT COUNT(*), AVG(length) FROM pages"
+        ).fetchone()
+        if not total:
+            return []
+        lengths: dict[tuple[int, int], int] = {}
+        postings = {term: self._postings(term, lengths) for term in terms}
+
+        candidates = None
+        for phrase in phrases:
+            if len(phrase) < 2:
+                continue
+            matches = {
+                key
+                for key, first in postings[phrase[0]].items()
+                if any(
+                    all(
+                        start + i in postings[term].get(key, ())
+                        for i, term in enumerate(phrase[1:], 1)
+                    )
+                    for start in first
+                )
+            }
+            candidates = matches if candidates is None else candidates & matches
+
+        scores: dict[tuple[int, int], float] = defaultdict(float)
+        for term, hits in postings.items():
+            idf = math.log(1 + (total - len(hits) + 0.5) / (len(hits) + 0.5))
+            for key, positions in hits.items():
+                if candidates is not None and key not in candidates:
+                    continue
+                tf = len(positions)
+                norm = 1 - self.B + self.B * lengths[key] / (avg_length or 1)
+                scores[key] += idf * tf * (self.K1 + 1) / (tf + self.K1 * norm)
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        paths = dict(self.db.execute("SELECT id, path FROM docs"))
+        return [(score, paths[doc_id], doc_id, page) for (doc_id, page), score in best]
+
+    def page_text(self, doc_id: int, page: int) -> str:
+        row = self.db.execute(
+            "SELECT text FROM pages WHERE doc_id = ? AND page = ?", (doc_id, page)
+        ).fetchone()
+        return zlib.decompress(row[0]).decode() if row else ""
+
+    def close(self) -> None:
+        self.db.close()
+
+
+def find_pdfs(target: str) -> list[Path]:
+    """PDF files under a directory, matching a glob, or a single file."""
+    path = Path(target)
+    if path.is_dir():
+        return sorted(p for p in path.rglob("*") if p.suffix.lower() == ".pdf")
+    if path.is_file():
+        return [path]
+    return sorted(Path(p) for p in glob.glob(target, recursive=True))
+
+
+def scan_file(file: Path, outline: bool = True) -> dict:
+    """Document-level facts about one PDF, without touching page contents.
+
+    Only the trailer, xref, catalog, info dictionary, page tree and outline
+    are read. Errors are reported in the record instead of raised.
+    """
+    record: dict = {"path": str(file)}
+    try:
+        record["size"] = file.stat().st_size
+        with open_mapped(file) as data:
+            reader = open_reader(data)
+            record["encrypted"] = reader.is_encrypted
+            if reader.is_encrypted and not reader.decrypt(""):
+                record["error"] = "Encrypted (password required)"
+                return record
+
+            record["pages"] = len(reader.pages)
+
+            meta = reader.metadata
+            if meta:
+                fields = {}
+                for name in ("title", "author", "subject", "creator", "producer"):
+                    fields[name] = getattr(meta, name)
+                for name, key in (
+                    ("creation_date", "/CreationDate"),
+                    ("modification_date", "/ModDate"),
+                ):
+                    try:
+                        value = getattr(meta, name)
+                        fields[name] = value.isoformat() if value else None
+                    except Exception:  # unparseable date: keep the raw string
+                        fields[name] = meta.get(key)
+                record["metadata"] = {k: str(v) for k, v in fields.items() if v}
+
+            if record["pages"]:
+                box = reader.pages[0].mediabox
+                record["mediabox"] = [float(box.width), float(box.height)]
+            if outline:
+                record["outline"] = outline_titles(reader.outline)
+            del reader
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    return record
+
+
+MANIFEST_FILE = "manifest.jsonl"
+PAGE_SEPARATOR = "\f"  # form feed between pages, as pdftotext does
+
+
+def extract_to_file(
+    src: Path, dest: Path, checkpoint_pages: int = 10, dedup: bool = False
+) -> dict:
+    """Extract a PDF's text to dest, resumable at page granularity.
+
+    Pages are appended to dest.partial; every checkpoint_pages pages the
+    file is fsynced and (pages done, byte offset) is written atomically to
+    dest.progress, along with the source's size, mtime and page count. A
+    rerun on the same source truncates the partial file to the last
+    checkpoint and continues from the next page; if the source changed it
+    starts over. On completion the partial file is renamed to dest. With
+    dedup, pages identical to ones this process already extracted are
+    reused (see PageDedup).
+    """
+    partial = dest.with_name(dest.name + ".partial")
+    progress = dest.with_name(dest.name + ".progress")
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    st = src.stat()
+
+    with open_mapped(src) as data:
+        total = len(open_reader(data).pages)
+        source = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "total": total}
+
+        done, offset = 0, 0
+        if partial.exists() and progress.exists():
+            try:
+                state = json.loads(progress.read_text())
+            except json.JSONDecodeError:
+                state = {}
+            if state.get("source") == source:
+                done, offset = state["pages"], state["offset"]
+
+        def checkpoint(f, pages: int) -> None:
+            f.flush()
+            os.fsync(f.fileno())
+            tmp = progress.with_name(progress.name + ".tmp")
+            state = {"source": source, "pages": pages, "offset": f.tell()}
+            tmp.write_text(json.dumps(state))
+            os.replace(tmp, progress)
+
+        with open(partial, "r+b" if done else "wb") as f:
+            f.truncate(offset)
+            f.seek(offset)
+            texts = stream_page_texts(
+                data, range(done, total), dedup=worker_dedup() if dedup else None
+            )
+            for i, text in texts:
+                f.write((text + PAGE_SEPARATOR).encode())
+                if (i + 1 - done) % checkpoint_pages == 0:
+                    checkpoint(f, i + 1)
+            f.flush()
+            os.fsync(f.fileno())
+
+    os.replace(partial, dest)
+    progress.unlink(missing_ok=True)
+    result = {
+        "pages": total,
+        "extracted": total - done,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    if dedup:
+        stats = worker_dedup().take_stats()
+        result.update(
+            reused=stats["reused"],
+            extract_seconds=round(stats["extract_seconds"], 3),
+        )
+    return result
 
 
 def cmd_extract(args: argparse.Namespace) -> None:
     """Extract text from PDF."""
-    reader = PdfReader(args.file)
-    total_pages = len(reader.pages)
+    if args.stream:
+        if args.workers > 1:
+            print("Error: --stream cannot be combined with --workers", file=sys.stderr)
+            sys.exit(2)
+        _extract_streaming(args)
+        return
 
-    # Parse page range
-    if args.pages:
-        start, end = parse_page_range(args.pages, total_pages)
-    else:
-        start, end = 0, total_pages
+    with open_cache(args) as cache:
+        doc = Document(args.file, cache)
+        pages = select_pages(args.pages, doc.page_count)
+        dedup = PageDedup() if args.dedup else None
+        # Close the generator here so its cache flush runs before the cache closes
+        with closing(doc.page_texts(pages, args.workers, dedup)) as texts:
+            print_pages(texts, args)
+        if dedup:
+            print(dedup_report(dedup.stats), file=sys.stderr)
 
-    for i in range(start, end):
-        page = reader.pages[i]
-        text = page.extract_text()
 
+def _extract_streaming(args: argparse.Namespace) -> None:
+    """extract --stream: mmap the file and extract in bounded windows."""
+    max_rss = args.max_rss * 2**20 if args.max_rss else None
+    with open_mapped(args.file) as data:
+        pages = select_pages(args.pages, len(open_reader(data).pages))
+        dedup = PageDedup() if args.dedup else None
+        texts = stream_page_texts(data, pages, args.window, max_rss, dedup)
+        try:
+            print_pages(texts, args, flush=True)
+        except MemoryError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    if dedup:
+        print(dedup_report(dedup.stats), file=sys.stderr)
+
+    # ru_maxrss also counts the pages of the mapping, which --max-rss does not
+    peak, anon = peak_rss(), anon_rss()
+    if peak:
+        print(
+            f"Peak RSS: {peak / 2**20:.1f} MB including mapped file pages"
+            + (f" (anonymous now: {anon / 2**20:.1f} MB)" if anon else ""),
+            file=sys.stderr,
+        )
+
+
+def print_pages(
+    texts: Iterator[tuple[int, str]], args: argparse.Namespace, flush: bool = False
+) -> None:
+    """Print extracted pages, with page markers if --verbose."""
+    flush = flush or args.workers > 1
+    for i, text in texts:
         if args.verbose:
             print(f"\n{'='*60}")
             print(f"Page {i + 1}")
             print("=" * 60)
 
         if text:
-            print(text)
+            print(text, flush=flush)
         elif args.verbose:
             print("[No text extracted - may be scanned/image-based]")
 
 
 def cmd_info(args: argparse.Namespace) -> None:
     """Show PDF metadata and info."""
-    reader = PdfReader(args.file)
+    reader = open_reader(args.file)
     meta = reader.metadata
 
     print(f"File: {args.file}")
@@ -83,47 +1114,119 @@ def cmd_info(args: argparse.Namespace) -> None:
         )
 
 
+def literal_pattern(words: Sequence[str]) -> str:
+    """Regex source matching any of the words, built from their trie.
+
+    Shared prefixes are merged, so re's engine walks the candidates like an
+    Aho-Corasick goto function in one pass instead of retrying each word.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}  # end of a word
+
+    def build(node: dict) -> str:
+        end = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in node.items() if ch]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not end:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")" + ("?" if end else "")
+
+    return build(trie)
+
+
+def compile_patterns(
+    patterns: Sequence[str], regex: bool = False, ignore_case: bool = False
+) -> re.Pattern:
+    """Compile search terms (or regexes) into a single pattern.
+
+    Each regex is checked on its own first, so a re.error names the user's
+    pattern and position rather than the combined one.
+    """
+    flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    if regex:
+        for p in patterns:
+            re.compile(p, flags)
+        source = "|".join(f"(?:{p})" for p in patterns)
+    else:
+        source = literal_pattern([p for p in patterns if p])
+    return re.compile(source, flags)
+
+
+def matching_lines(pattern: re.Pattern, text: str) -> list[int]:
+    """Line numbers (0-based) of lines where pattern matches in text."""
+    starts = [0]
+    newline = text.find("\n")
+    while newline != -1:
+        starts.append(newline + 1)
+        newline = text.find("\n", newline + 1)
+    return sorted({bisect_right(starts, m.start()) - 1 for m in pattern.finditer(text)})
+
+
 def cmd_search(args: argparse.Namespace) -> None:
     """Search for text in PDF."""
-    reader = PdfReader(args.file)
-    query = args.query.lower() if args.ignore_case else args.query
-    found = False
+    try:
+        pattern = compile_patterns(args.query, args.regex, args.ignore_case)
+    except re.error as e:
+        print(f"Error: Invalid regex '{e.pattern}': {e}", file=sys.stderr)
+        sys.exit(2)
+    max_count = 1 if args.first else args.max_count
+    found = 0
 
-    for i, page in enumerate(reader.pages):
-        text = page.extract_text()
-        if not text:
-            continue
+    with open_cache(args) as cache:
+        doc = Document(args.file, cache)
+        pages = select_pages(args.pages, doc.page_count)
+        # Pages are extracted lazily, so stopping early skips the rest
+        with closing(doc.page_texts(pages)) as texts:
+            for i, text in texts:
+                if not text:
+                    continue
 
-        search_text = text.lower() if args.ignore_case else text
+                line_nums = matching_lines(pattern, text)
+                if not line_nums:
+                    continue
+                if args.files_with_matches:
+                    print(args.file)
+                    return
 
-        if query in search_text:
-            found = True
-            print(f"\n--- Page {i + 1} ---")
+                print(f"\n--- Page {i + 1} ---")
 
-            # Find and show context around matches
-            lines = text.split("\n")
-            for line_num, line in enumerate(lines):
-                search_line = line.lower() if args.ignore_case else line
-                if query in search_line:
-                    # Show surrounding context
-                    start = max(0, line_num - args.context)
-                    end = min(len(lines), line_num + args.context + 1)
-                    for j in range(start, end):
-                        prefix = ">>> " if j == line_num else "    "
-                        print(f"{prefix}{lines[j]}")
-                    print()
+                # Show context around matches
+                lines = text.split("\n")
+                if max_count:
+                    line_nums = line_nums[: max_count - found]
+                for line_num in line_nums:
+                    print_context(lines, line_num, args.context)
+                found += len(line_nums)
+                if max_count and found >= max_count:
+                    break
 
     if not found:
-        print(f"No matches found for '{args.query}'")
+        if not args.files_with_matches:
+            terms = "' or '".join(args.query)
+            print(f"No matches found for '{terms}'")
         sys.exit(1)
 
 
+def print_context(lines: list[str], line_num: int, context: int) -> None:
+    """Print a matching line with surrounding context lines."""
+    start = max(0, line_num - context)
+    end = min(len(lines), line_num + context + 1)
+    for j in range(start, end):
+        prefix = ">>> " if j == line_num else "    "
+        print(f"{prefix}{lines[j]}")
+    print()
+
+
 def cmd_toc(args: argparse.Namespace) -> None:
     """Show table of contents / outline."""
-    reader = PdfReader(args.file)
-
     try:
-        outline = reader.outline
+        with open_cache(args) as cache:
+            outline = Document(args.file, cache).outline()
         if not outline:
             print("No table of contents found")
             return
@@ -134,24 +1237,358 @@ def cmd_toc(args: argparse.Namespace) -> None:
                     print_outline(item, level + 1)
                 else:
                     indent = "  " * level
-                    title = item.title if hasattr(item, "title") else str(item)
-                    print(f"{indent}- {title}")
+                    print(f"{indent}- {item}")
 
         print_outline(outline)
     except Exception as e:
         print(f"Could not extract outline: {e}")
 
 
-def parse_page_range(s: str, total: int) -> tuple[int, int]:
-    """Parse page range string like '1-5' or '3'."""
-    if "-" in s:
-        parts = s.split("-")
-        start = int(parts[0]) - 1  # Convert to 0-indexed
-        end = int(parts[1]) if parts[1] else total
-        return max(0, start), min(end, total)
-    else:
-        page = int(s) - 1
-        return page, page + 1
+def cmd_index(args: argparse.Namespace) -> None:
+    """Build or query the corpus-wide search index."""
+    try:
+        index = SearchIndex(args.index)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Error: Could not open index {args.index}: {e}", file=sys.stderr)
+        sys.exit(1)
+    try:
+        if args.action == "build":
+            with open_cache(args) as cache:
+                counts = index.update(args.dir, cache, args.workers)
+            print(
+                f"Indexed {counts['indexed']} files ({counts['pages']} pages), "
+                f"{counts['unchanged']} unchanged, {counts['removed']} removed"
+                + (f", {counts['failed']} failed" if counts["failed"] else "")
+            )
+            return
+
+        with profiled("index_query"):
+            hits = index.query(args.terms, args.limit)
+        if not hits:
+            print(f"No matches found for '{args.terms}'")
+            sys.exit(1)
+
+        terms = set(tokenize(args.terms))
+        for score, path, doc_id, page in hits:
+            print(f"\n--- {path}, page {page + 1} (score {score:.2f}) ---")
+            lines = index.page_text(doc_id, page).split("\n")
+            for line_num, line in enumerate(lines):
+                if terms & set(tokenize(line)):
+                    print_context(lines, line_num, args.context)
+    finally:
+        index.close()
+
+
+def cmd_cache(args: argparse.Namespace) -> None:
+    """Show or clear the extracted-text cache."""
+    with open_cache(args) as cache:
+        if cache is None:
+            sys.exit(1)
+        if args.action == "clear":
+            cache.clear()
+            print(f"Cleared cache: {cache.path}")
+            return
+
+        stats = cache.stats()
+        lookups = stats["hits"] + stats["misses"]
+        print(f"Cache: {stats['path']}")
+        print(f"Documents: {stats['documents']}")
+        print(f"Pages: {stats['pages']}")
+        print(
+            f"Size: {stats['bytes'] / 2**20:.1f} MB "
+            f"(limit {stats['max_bytes'] / 2**20:.0f} MB)"
+        )
+        if lookups:
+            print(
+                f"Hits: {stats['hits']}, Misses: {stats['misses']} "
+                f"({stats['hits'] / lookups:.0%} hit rate)"
+            )
+
+
+def cmd_scan(args: argparse.Namespace) -> None:
+    """Write one JSON line of metadata per PDF in a directory or glob."""
+    files = find_pdfs(args.target)
+    out = open(args.output, "w") if args.output else sys.stdout
+    started = time.perf_counter()
+    errors = 0
+    try:
+        scan = partial(scan_file, outline=not args.no_outline)
+        with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            if _profile is not None:
+                scan = partial(_call_profiled, scan)
+            for record in pool.map(scan, files, chunksize=8):
+                if _profile is not None:
+                    record, snapshot = record
+                    _profile.merge(snapshot)
+                errors += "error" in record
+                out.write(json.dumps(record) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"Scanned {len(files)} files ({errors} errors) in {elapsed:.1f}s",
+        file=sys.stderr,
+    )
+
+
+def cmd_bulk_extract(args: argparse.Namespace) -> None:
+    """Extract a corpus to text files, resuming from the last checkpoint."""
+    files = find_pdfs(args.source)
+    if not files:
+        print(f"No PDF files found in {args.source}", file=sys.stderr)
+        sys.exit(1)
+    source = Path(args.source)
+    root = (
+        source
+        if source.is_dir()
+        else Path(os.path.commonpath([f.parent for f in files]))
+    )
+    outdir = Path(args.outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+
+    # The manifest is append-only; a torn last line from a crash is ignored
+    manifest_path = outdir / MANIFEST_FILE
+    completed = {}
+    if manifest_path.exists():
+        with open(manifest_path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get("status") == "done":
+                    completed[entry["path"]] = entry
+
+    todo = []
+    for file in files:
+        rel = str(file.relative_to(root))
+        st = file.stat()
+        entry = completed.get(rel, {})
+        if (entry.get("size"), entry.get("mtime_ns")) != (st.st_size, st.st_mtime_ns):
+            todo.append((file, rel, st))
+
+    # With --dedup, content digest -> (path, pages) of an output to copy;
+    # outputs about to be rewritten by this run can't serve as originals
+    rewritten = {rel for _, rel, _ in todo}
+    originals = {
+        entry["digest"]: (rel, entry["pages"])
+        for rel, entry in completed.items()
+        if "digest" in entry and rel not in rewritten
+    }
+    waiting: dict[str, list] = {}  # digest -> duplicates of a file in flight
+    counts: Counter = Counter()
+    print(
+        f"{len(files) - len(todo)} of {len(files)} files already done, "
+        f"{len(todo)} to go",
+        file=sys.stderr,
+    )
+
+    started = last_report = time.perf_counter()
+    stats = {"files": 0, "errors": 0, "pages": 0, "bytes": 0}
+
+    def report(final: bool = False) -> None:
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        print(
+            f"[{stats['files']}/{len(todo)}] {stats['pages']} pages, "
+            f"{stats['pages'] / elapsed:.1f} pages/s, "
+            f"{stats['bytes'] / 2**20 / elapsed:.1f} MB/s"
+            + (f", {stats['errors']} errors" if stats["errors"] else "")
+            + (f" in {elapsed:.1f}s" if final else ""),
+            file=sys.stderr,
+        )
+
+    queue = iter(todo)
+    pending: dict = {}
+    max_pending = args.max_pending or 2 * args.workers
+    with (
+        open(manifest_path, "a") as manifest,
+        ProcessPoolExecutor(max_workers=args.workers) as pool,
+    ):
+
+        def finish(item: tuple, digest: str | None, result: dict | Exception) -> None:
+            """Record a finished file in the manifest and the stats."""
+            file, rel, st = item
+            entry = {"path": rel, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+            if digest:
+                entry["digest"] = digest
+            if isinstance(result, Exception):
+                entry.update(status="error", error=f"{type(result).__name__}: {result}")
+                stats["errors"] += 1
+                print(f"{file}: Error - {result}", file=sys.stderr)
+            else:
+                entry.update(result, status="done")
+                stats["pages"] += entry["extracted"]
+                stats["bytes"] += st.st_size
+                counts["pages"] += entry["extracted"]
+                counts["reused"] += entry.get("reused", 0)
+                counts["extract_seconds"] += entry.get("extract_seconds", 0)
+            stats["files"] += 1
+            counts["files"] += 1
+            manifest.write(json.dumps(entry) + "\n")
+            manifest.flush()
+            os.fsync(manifest.fileno())
+
+        def copy_duplicate(item: tuple, digest: str) -> None:
+            """Finish a file identical to an extracted one by copying its text."""
+            original, pages = originals[digest]
+            dest = outdir / (item[1] + ".txt")
+            try:
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(outdir / (original + ".txt"), dest)
+            except OSError as e:
+                finish(item, digest, e)
+                return
+            counts["duplicate_files"] += 1
+            counts["duplicate_pages"] += pages
+            finish(
+                item,
+                digest,
+                {"pages": pages, "extracted": 0, "duplicate_of": original},
+            )
+
+        try:
+            while True:
+                # Backpressure: only max_pending documents in flight
+                while len(pending) < max_pending:
+                    item = next(queue, None)
+                    if item is None:
+                        break
+                    file, rel, st = item
+                    digest = file_digest(file) if args.dedup else None
+                    if digest in originals:
+                        copy_duplicate(item, digest)
+                        continue
+                    if digest in waiting:
+                        waiting[digest].append(item)
+                        continue
+                    if digest:
+                        waiting[digest] = []
+                    dest = outdir / (rel + ".txt")
+                    future = submit(
+                        pool, extract_to_file, file, dest, args.checkpoint, args.dedup
+                    )
+                    pending[future] = (item, digest)
+                if not pending:
+                    break
+
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    item, digest = pending.pop(future)
+                    try:
+                        result = result_of(future)
+                    except Exception as e:
+                        result = e
+                    finish(item, digest, result)
+                    if digest and not isinstance(result, Exception):
+                        originals[digest] = (item[1], result["pages"])
+                    for duplicate in waiting.pop(digest, ()):
+                        if digest in originals:
+                            copy_duplicate(duplicate, digest)
+                        else:  # the same bytes would fail the same way
+                            finish(duplicate, digest, result)
+
+                if time.perf_counter() - last_report >= args.report_every:
+                    report()
+                    last_report = time.perf_counter()
+        except KeyboardInterrupt:
+            pool.shutdown(cancel_futures=True)
+            print("Interrupted; rerun the same command to resume", file=sys.stderr)
+            sys.exit(130)
+
+    report(final=True)
+    if args.dedup:
+        print(dedup_report(counts), file=sys.stderr)
+
+
+PAGE_ITEM_RE = re.compile(
+    r"(?P<a>-?\d+)?(?:(?P<dash>-)(?P<b>-?\d+)?)?(?::(?P<step>\d+))?"
+)
+FIRST_LAST_RE = re.compile(r"(first|last)\s*(\d+)")
+
+PAGES_HELP = (
+    "Pages to use, 1-based and comma-separated: '3', '1-5', '12-' (to the "
+    "end), '-1' (last page), '-10-' or 'last 10', 'first 5', '9-3' "
+    "(reversed), '1-:2' (every other page); e.g. '1-3,50,900-905'. "
+    "Write --pages=-10- when the spec starts with '-'"
+)
+
+
+def _page_index(n: int, total: int) -> int:
+    """0-based index of a 1-based page number; negative counts from the end."""
+    if n == 0:
+        raise ValueError("Pages are numbered from 1")
+    return n - 1 if n > 0 else total + n
+
+
+def parse_page_range(s: str, total: int) -> list[int]:
+    """Parse a page-set spec like '1-3,50,900-905' into 0-based indices.
+
+    Items are single pages, ranges (either end may be open or negative,
+    descending if reversed) with an optional ':step', or 'first N' and
+    'last N'. Ranges are clipped to the document; a single page outside it
+    is an error. Indices come in spec order, each page once.
+    """
+    pages: dict[int, None] = {}
+    for item in s.lower().split(","):
+        item = item.strip()
+        if m := FIRST_LAST_RE.fullmatch(item):
+            n = min(int(m[2]), total)
+            selected = range(n) if m[1] == "first" else range(total - n, total)
+        else:
+            m = PAGE_ITEM_RE.fullmatch(item)
+            if not m or not (m["a"] or m["b"]) or (m["step"] and not m["dash"]):
+                raise ValueError(f"Invalid page spec '{item}'")
+            if not m["dash"]:
+                page = _page_index(int(m["a"]), total)
+                if not 0 <= page < total:
+                    raise ValueError(
+                        f"Page {m['a']} is out of range (document has {total} pages)"
+                    )
+                selected = (page,)
+            else:
+                step = int(m["step"] or 1)
+                if step == 0:
+                    raise ValueError(f"Invalid step in page spec '{item}'")
+                start = _page_index(int(m["a"]), total) if m["a"] else 0
+                # An open end runs forwards, so '12-' of 10 pages is empty
+                end = (
+                    _page_index(int(m["b"]), total) if m["b"] else max(start, total - 1)
+                )
+                selected = _clipped_range(start, end, step, total)
+        pages.update(dict.fromkeys(selected))
+    return list(pages)
+
+
+def _clipped_range(start: int, end: int, step: int, total: int) -> range:
+    """Inclusive start..end by step (downwards if end < start), within [0, total)."""
+    if start <= end:
+        if start < 0:  # skip ahead, keeping the step's phase
+            start += -(start // step) * step
+        return range(start, min(end, total - 1) + 1, step)
+    if start >= total:
+        start -= -((start - total + 1) // -step) * step
+    return range(start, max(end, 0) - 1, -step)
+
+
+def select_pages(spec: str | None, total: int) -> Sequence[int]:
+    """Pages chosen by a --pages spec (all pages if None); exits on a bad spec."""
+    if not spec:
+        return range(total)
+    try:
+        return parse_page_range(spec, total)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(2)
+
+
+def positive_int(value: str) -> int:
+    """argparse type for options that must be at least 1."""
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {n}")
+    return n
 
 
 def main() -> None:
@@ -160,15 +1597,57 @@ def main() -> None:
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog=__doc__,
     )
+    add_profile_args(parser, "phase timings, extraction latencies and cache hit rates")
     subparsers = parser.add_subparsers(dest="command", required=True)
 
+    # Cache options shared by the subcommands that read page text; the cache
+    # command itself takes only the location options
+    cache_location = argparse.ArgumentParser(add_help=False)
+    cache_location.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=DEFAULT_CACHE_DIR,
+        help=f"Text cache directory (default: {DEFAULT_CACHE_DIR})",
+    )
+    cache_location.add_argument(
+        "--cache-size", type=int, default=512, help="Cache size limit in MB"
+    )
+    cache_args = argparse.ArgumentParser(add_help=False, parents=[cache_location])
+    cache_args.add_argument(
+        "--no-cache", action="store_true", help="Do not read or write the cache"
+    )
+
     # extract
-    p_extract = subparsers.add_parser("extract", help="Extract text from PDF")
+    p_extract = subparsers.add_parser(
+        "extract", help="Extract text from PDF", parents=[cache_args]
+    )
     p_extract.add_argument("file", type=Path, help="PDF file path")
-    p_extract.add_argument("--pages", help="Page range (e.g., '1-5' or '3')")
+    p_extract.add_argument("--pages", help=PAGES_HELP)
     p_extract.add_argument(
         "-v", "--verbose", action="store_true", help="Show page markers"
     )
+    p_extract.add_argument(
+        "--workers", type=int, default=1, help="Worker processes (default: 1)"
+    )
+    p_extract.add_argument(
+        "--stream",
+        action="store_true",
+        help="Bounded-memory mode: mmap the file, extract in windows (no cache)",
+    )
+    p_extract.add_argument(
+        "--window", type=positive_int, default=50, help="Pages per window with --stream"
+    )
+    p_extract.add_argument(
+        "--max-rss",
+        type=positive_int,
+        help="Anonymous memory ceiling in MB with --stream (mapped file pages "
+        "are not counted)",
+    )
+    p_extract.add_argument(
+        "--dedup",
+        action="store_true",
+        help="Extract byte-identical pages once and report the work saved",
+    )
     p_extract.set_defaults(func=cmd_extract)
 
     # info
@@ -177,24 +1656,123 @@ def main() -> None:
     p_info.set_defaults(func=cmd_info)
 
     # search
-    p_search = subparsers.add_parser("search", help="Search text in PDF")
+    p_search = subparsers.add_parser(
+        "search", help="Search text in PDF", parents=[cache_args]
+    )
     p_search.add_argument("file", type=Path, help="PDF file path")
-    p_search.add_argument("query", help="Search term")
+    p_search.add_argument("query", nargs="+", help="Search term(s); any may match")
+    p_search.add_argument("--pages", help=PAGES_HELP)
     p_search.add_argument(
         "-i", "--ignore-case", action="store_true", help="Case insensitive"
     )
+    p_search.add_argument(
+        "-E", "--regex", action="store_true", help="Treat terms as regexes"
+    )
     p_search.add_argument(
         "-C", "--context", type=int, default=2, help="Lines of context"
     )
+    p_search.add_argument(
+        "-m", "--max-count", type=int, help="Stop after N matching lines"
+    )
+    p_search.add_argument(
+        "--first", action="store_true", help="Stop after the first matching line"
+    )
+    p_search.add_argument(
+        "-l",
+        "--files-with-matches",
+        action="store_true",
+        help="Only print the file name if it matches",
+    )
     p_search.set_defaults(func=cmd_search)
 
     # toc
-    p_toc = subparsers.add_parser("toc", help="Show table of contents")
+    p_toc = subparsers.add_parser(
+        "toc", help="Show table of contents", parents=[cache_args]
+    )
     p_toc.add_argument("file", type=Path, help="PDF file path")
     p_toc.set_defaults(func=cmd_toc)
 
+    # index
+    p_index = subparsers.add_parser("index", help="Corpus-wide search index")
+    p_index.add_argument(
+        "--index",
+        type=Path,
+        default=DEFAULT_INDEX,
+        help=f"Index database (default: {DEFAULT_INDEX})",
+    )
+    index_actions = p_index.add_subparsers(dest="action", required=True)
+    p_build = index_actions.add_parser(
+        "build", help="Index new/changed PDFs in a directory", parents=[cache_args]
+    )
+    p_build.add_argument("dir", type=Path, help="Directory to scan recursively")
+    p_build.add_argument(
+        "--workers", type=int, default=1, help="Worker processes per file"
+    )
+    p_query = index_actions.add_parser("query", help="Ranked search of the index")
+    p_query.add_argument("terms", help="Search terms; quote phrases")
+    p_query.add_argument("-n", "--limit", type=int, default=10, help="Max hits")
+    p_query.add_argument(
+        "-C", "--context", type=int, default=2, help="Lines of context"
+    )
+    p_index.set_defaults(func=cmd_index)
+
+    # scan
+    p_scan = subparsers.add_parser(
+        "scan", help="Metadata/TOC of many PDFs as JSON lines"
+    )
+    p_scan.add_argument("target", help="Directory, glob pattern or PDF file")
+    p_scan.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes (default: CPU count)",
+    )
+    p_scan.add_argument("-o", "--output", help="Write JSON lines to this file")
+    p_scan.add_argument(
+        "--no-outline", action="store_true", help="Skip reading the outline"
+    )
+    p_scan.set_defaults(func=cmd_scan)
+
+    # bulk-extract
+    p_bulk = subparsers.add_parser(
+        "bulk-extract", help="Resumable extraction of many PDFs to text files"
+    )
+    p_bulk.add_argument("source", help="Directory, glob pattern or PDF file")
+    p_bulk.add_argument("outdir", help="Output directory (holds the manifest)")
+    p_bulk.add_argument(
+        "--workers",
+        type=positive_int,
+        default=os.cpu_count() or 1,
+        help="Worker processes (default: CPU count)",
+    )
+    p_bulk.add_argument(
+        "--max-pending",
+        type=positive_int,
+        help="Documents in flight (default: 2x workers)",
+    )
+    p_bulk.add_argument(
+        "--checkpoint", type=positive_int, default=10, help="Pages between checkpoints"
+    )
+    p_bulk.add_argument(
+        "--report-every", type=float, default=5.0, help="Seconds between stats"
+    )
+    p_bulk.add_argument(
+        "--dedup",
+        action="store_true",
+        help="Copy output for duplicate files and reuse text of identical pages",
+    )
+    p_bulk.set_defaults(func=cmd_bulk_extract)
+
+    # cache
+    p_cache = subparsers.add_parser(
+        "cache", help="Manage the extracted-text cache", parents=[cache_location]
+    )
+    p_cache.add_argument("action", choices=["stats", "clear"], help="Cache action")
+    p_cache.set_defaults(func=cmd_cache)
+
     args = parser.parse_args()
-    args.func(args)
+    with profiling(args):
+        args.func(args)
 
 
 if __name__ == "__main__":
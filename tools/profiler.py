@@ -0,0 +1,203 @@
+"""Profiling support shared by the tools' --profile options.
+
+Each tool keeps a module-level _profile that is None unless profiling, so
+instrumented hot paths cost one global lookup when it is off. This module
+holds the pieces that do not depend on the tool: the Profiler itself and
+the session that turns --profile, --profile-out, --cprofile and
+--tracemalloc into a JSON report.
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class Profiler:
+    """Phase timers, counters, cache statistics and latency samples.
+
+    Phases accumulate wall time and calls, samples keep every latency for
+    percentiles, counters count events such as strptime misses and caches
+    count hits and misses. Worker processes send snapshot() back to be
+    merged into the parent's profiler.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.phases: dict[str, list] = {}  # name -> [seconds, calls]
+        self.samples: dict[str, list[float]] = {}
+        self.counters: Counter = Counter()
+        self.caches: dict[str, list[int]] = {}  # name -> [hits, misses]
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - started)
+
+    def add_phase(self, name: str, seconds: float, calls: int = 1) -> None:
+        entry = self.phases.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += calls
+
+    def sample(self, name: str, seconds: float) -> None:
+        self.samples.setdefault(name, []).append(seconds)
+
+    def add_cache(self, name: str, hits: int, misses: int) -> None:
+        entry = self.caches.setdefault(name, [0, 0])
+        entry[0] += hits
+        entry[1] += misses
+
+    def snapshot(self) -> dict:
+        """Picklable raw state, for sending back from a worker process."""
+        return {
+            "phases": self.phases,
+            "samples": self.samples,
+            "counters": dict(self.counters),
+            "caches": self.caches,
+        }
+
+    def merge(self, snapshot: dict) -> None:
+        """Fold in the snapshot of a worker process."""
+        for name, (seconds, calls) in snapshot["phases"].items():
+            self.add_phase(name, seconds, calls)
+        for name, values in snapshot["samples"].items():
+            self.samples.setdefault(name, []).extend(values)
+        self.counters.update(snapshot["counters"])
+        for name, (hits, misses) in snapshot["caches"].items():
+            self.add_cache(name, hits, misses)
+
+    def report(self) -> dict:
+        """Summary with per-phase totals and latency percentiles in ms."""
+        latency = {}
+        for name, values in sorted(self.samples.items()):
+            values = sorted(values)
+            latency[name] = {
+                "count": len(values),
+                "total_s": round(sum(values), 4),
+                **{
+                    f"p{q}_ms": round(nearest_rank(values, q) * 1000, 3)
+                    for q in (50, 90, 99)
+                },
+                "max_ms": round(values[-1] * 1000, 3),
+            }
+        return {
+            "wall_s": round(time.perf_counter() - self.started, 4),
+            "phases": {
+                name: {"seconds": round(seconds, 4), "calls": calls}
+                for name, (seconds, calls) in sorted(self.phases.items())
+            },
+            "latency": latency,
+            "counters": dict(sorted(self.counters.items())),
+            "caches": {
+                name: {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": round(hits / (hits + misses), 4),
+                }
+                for name, (hits, misses) in sorted(self.caches.items())
+                if hits + misses
+            },
+        }
+
+
+def nearest_rank(values: list[float], q: int) -> float:
+    """The q-th percentile of sorted values (nearest-rank method)."""
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+
+def peak_rss() -> int | None:
+    """Peak resident set size of this process in bytes."""
+    try:
+        import resource
+    except ImportError:  # not available on Windows; peak RSS is then unreported
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # KB on Linux
+
+
+@contextmanager
+def profile_session(args: argparse.Namespace) -> Iterator[Profiler | None]:
+    """Run a command under --profile, --cprofile and --tracemalloc as asked.
+
+    Yields the session's Profiler, or None when no profiling option is set.
+    The JSON report goes to stderr, or to --profile-out; it is written even
+    when the command exits with an error.
+    """
+    if not (args.profile or args.profile_out or args.cprofile or args.tracemalloc):
+        yield None
+        return
+
+    # Imported here: tracemalloc pulls in pickle, which unprofiled runs skip
+    import cProfile
+    import tracemalloc
+
+    profile = Profiler()
+    if args.tracemalloc:
+        tracemalloc.start()
+    profiler = cProfile.Profile() if args.cprofile else None
+    if profiler:
+        profiler.enable()
+    try:
+        yield profile
+    finally:
+        if profiler:
+            profiler.disable()
+        report = {"command": args.command, **profile.report()}
+        peak = peak_rss()
+        if peak:
+            report["peak_rss_mb"] = round(peak / 2**20, 1)
+        if args.tracemalloc:
+            # Leave out the profilers' own bookkeeping
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                [
+                    tracemalloc.Filter(False, cProfile.__file__),
+                    tracemalloc.Filter(False, tracemalloc.__file__),
+                ]
+            )
+            report["tracemalloc"] = {
+                "peak_mb": round(tracemalloc.get_traced_memory()[1] / 2**20, 1),
+                "top": [
+                    {
+                        "site": str(stat.traceback[0]),
+                        "kb": round(stat.size / 1024, 1),
+                        "count": stat.count,
+                    }
+                    for stat in snapshot.statistics("lineno")[: args.tracemalloc]
+                ],
+            }
+            tracemalloc.stop()
+        if profiler:
+            profiler.dump_stats(args.cprofile)
+        text = json.dumps(report, indent=2)
+        if args.profile_out:
+            Path(args.profile_out).write_text(text + "\n")
+        else:
+            print(text, file=sys.stderr)
+
+
+def add_profile_args(parser: argparse.ArgumentParser, reports: str) -> None:
+    """Add the options profile_session reads; reports describes --profile."""
+    group = parser.add_argument_group("profiling")
+    group.add_argument(
+        "--profile", action="store_true", help=f"Print {reports} as JSON"
+    )
+    group.add_argument(
+        "--profile-out", metavar="FILE", help="Write the --profile JSON to FILE"
+    )
+    group.add_argument(
+        "--cprofile", metavar="FILE", help="Also save cProfile stats to FILE"
+    )
+    group.add_argument(
+        "--tracemalloc",
+        type=int,
+        metavar="N",
+        help="Also trace allocations and report the top N sites",
+    )